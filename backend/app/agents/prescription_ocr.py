@@ -13,6 +13,8 @@ from google.generativeai import GenerativeModel
 
 import re
 
+from app.services.formulary import get_formulary
+
 logger = logging.getLogger(__name__)
 
 PRESCRIPTION_OCR_PROMPT = """Read this prescription image. 
@@ -20,12 +22,85 @@ Extract the following fields into JSON:
 - patient_name (at the top)
 - age (number)
 - gender (Male/Female)
-- medications (list of {drug, dosage, frequency, duration})
+- medications (list of {drug, dosage, frequency, duration, confidence})
 - notes (any extra info like 'Makati City' or 'Next to hospital')
+- confidence (object with patient_name, age, gender, medications — each a number 0-1
+  saying how sure you are you read that field correctly; use 0 if unreadable)
 
+Each medication's confidence is a number 0-1 for how legible that line was.
 Respond with JSON only. No text, no markdown.
 """
 
+# ── Progressive resolution ────────────────────────────
+# First pass uses a downscaled copy; most printed prescriptions read fine at this size.
+LOW_RES_MAX_SIDE = 1024
+# Escalate to the full-resolution image when any checked field falls below this.
+ESCALATION_CONFIDENCE = 0.7
+REQUIRED_FIELDS = ("medications",)
+
+# Running counters so the escalation rate can be monitored
+_ocr_stats = {"total": 0, "escalated": 0}
+
+
+def get_ocr_stats() -> dict:
+    """Return OCR pass counters and the share of requests that needed the full-resolution pass."""
+    total = _ocr_stats["total"]
+    return {
+        **_ocr_stats,
+        "escalation_rate": round(_ocr_stats["escalated"] / total, 3) if total else 0.0,
+    }
+
+
+def _downscale(image: Image.Image, max_side: int) -> Image.Image:
+    """Return a copy no larger than max_side on its longest edge (the original if already small)."""
+    if max(image.size) <= max_side:
+        return image
+    small = image.convert("RGB") if image.mode not in ("RGB", "L") else image.copy()
+    small.thumbnail((max_side, max_side), Image.LANCZOS)
+    return small
+
+
+def _run_ocr(model: GenerativeModel, image: Image.Image) -> dict:
+    """Single Gemini Vision pass; returns the parsed JSON (raises JSONDecodeError on bad output)."""
+    response = model.generate_content([PRESCRIPTION_OCR_PROMPT, image])
+    raw_text = response.text.strip()
+    logger.debug(f"💊 RAW AI RESPONSE: {raw_text}")
+
+    # Clean potential markdown code fences
+    if raw_text.startswith("```"):
+        raw_text = raw_text.split("\n", 1)[1] if "\n" in raw_text else raw_text[3:]
+    if raw_text.endswith("```"):
+        raw_text = raw_text[:-3]
+    raw_text = raw_text.strip()
+
+    return json.loads(raw_text)
+
+
+def _low_confidence_fields(result: dict) -> list[str]:
+    """List required fields that are missing and any fields the model was unsure about."""
+    flagged = [f for f in REQUIRED_FIELDS if not result.get(f)]
+
+    confidence = result.get("confidence")
+    if isinstance(confidence, dict):
+        for field, value in confidence.items():
+            try:
+                if float(value) < ESCALATION_CONFIDENCE and field not in flagged:
+                    # Optional fields only count when the model actually returned something
+                    if field in REQUIRED_FIELDS or result.get(field) not in (None, ""):
+                        flagged.append(field)
+            except (TypeError, ValueError):
+                continue
+
+    for i, med in enumerate(result.get("medications") or []):
+        if not isinstance(med, dict):
+            continue
+        try:
+            if float(med.get("confidence", 1)) < ESCALATION_CONFIDENCE:
+                flagged.append(f"medications[{i}]")
+        except (TypeError, ValueError):
+            continue
+    return flagged
+
 
 async def digitize_prescription(
     model: GenerativeModel,
@@ -46,20 +121,31 @@ async def digitize_prescription(
         # Prepare the image for Gemini
         image = Image.open(io.BytesIO(image_bytes))
         logger.debug(f"   Image loaded: {image.format} {image.size}")
-
-        # Send multimodal request (image + text prompt)
-        response = model.generate_content([PRESCRIPTION_OCR_PROMPT, image])
-        raw_text = response.text.strip()
-        logger.debug(f"💊 RAW AI RESPONSE: {raw_text}")
-
-        # Clean potential markdown code fences
-        if raw_text.startswith("```"):
-            raw_text = raw_text.split("\n", 1)[1] if "\n" in raw_text else raw_text[3:]
-        if raw_text.endswith("```"):
-            raw_text = raw_text[:-3]
-        raw_text = raw_text.strip()
-
-        result = json.loads(raw_text)
+        _ocr_stats["total"] += 1
+
+        low_res = _downscale(image, LOW_RES_MAX_SIDE)
+        escalated = False
+        if low_res is image:
+            # Already small enough — a single pass at native resolution
+            result = _run_ocr(model, image)
+        else:
+            # ── Pass 1: downscaled image ──
+            logger.info(f"   Pass 1: low resolution {low_res.size}")
+            try:
+                result = _run_ocr(model, low_res)
+                flagged = _low_confidence_fields(result)
+            except json.JSONDecodeError:
+                flagged = ["unparseable"]
+
+            # ── Pass 2: full resolution, only when pass 1 was missing or unsure ──
+            if flagged:
+                escalated = True
+                _ocr_stats["escalated"] += 1
+                logger.info(f"   Pass 2: full resolution {image.size} (low confidence: {', '.join(flagged)})")
+                result = _run_ocr(model, image)
+
+        stats = get_ocr_stats()
+        logger.info(f"   Escalation rate: {stats['escalated']}/{stats['total']} ({stats['escalation_rate']:.0%})")
         
         # Robust Name Extraction
         patient_name = result.get("patient_name") or result.get("name") or result.get("Patient Name")
@@ -85,16 +171,24 @@ async def digitize_prescription(
             age = None
 
         medications = result.get("medications", [])
+        formulary = get_formulary()
         validated_meds = []
         for med in medications:
+            drug = med.get("drug") or med.get("name") or "Unknown"
+            # Post-OCR normalization: map to a canonical formulary entry (local, no model call)
+            match = formulary.match(drug) or {}
             validated_meds.append({
-                "drug": med.get("drug") or med.get("name") or "Unknown",
+                "drug": drug,
                 "dosage": med.get("dosage", "N/A"),
                 "frequency": med.get("frequency", "N/A"),
                 "duration": med.get("duration", "N/A"),
+                "canonical_id": match.get("canonical_id"),
+                "generic_name": match.get("generic_name"),
+                "match_confidence": match.get("match_confidence"),
             })
 
-        logger.info(f"   ✅ SUCCESS - {len(validated_meds)} medications extracted")
+        normalized = sum(1 for m in validated_meds if m["canonical_id"])
+        logger.info(f"   ✅ SUCCESS - {len(validated_meds)} medications extracted ({normalized} matched to formulary)")
         if patient_name:
             logger.info(f"   👤 Patient: {patient_name} ({age}, {gender})")
 
@@ -104,6 +198,8 @@ async def digitize_prescription(
             "gender": gender,
             "medications": validated_meds,
             "notes": result.get("notes", ""),
+            "confidence": result.get("confidence") if isinstance(result.get("confidence"), dict) else None,
+            "escalated": escalated,
         }
 
     except json.JSONDecodeError as e:
@@ -53,10 +53,13 @@ async def assess_patient_priority(
     gender: str,
     symptoms: str,
     history: list[str],
+    raise_on_error: bool = False,
 ) -> dict:
     """
     Call Gemini to assess patient urgency.
     Returns dict with urgency_score, urgency_level, wait_time, reasoning.
+    On failure returns a Medium fallback, or re-raises with `raise_on_error`
+    (callers that can retry later must not store the fallback as a result).
     """
     history_str = ", ".join(history) if history else "No significant history"
 
@@ -75,7 +78,8 @@ async def assess_patient_priority(
     logger.info(f"   Status: STARTING...")
 
     try:
-        response = model.generate_content(prompt)
+        # Async call so concurrent triage (bulk import) doesn't block the event loop
+        response = await model.generate_content_async(prompt)
         raw_text = response.text.strip()
 
         # Clean potential markdown code fences
@@ -108,6 +112,8 @@ async def assess_patient_priority(
 
     except Exception as e:
         logger.error(f"   ❌ FAILED: {e}")
+        if raise_on_error:
+            raise
         # Fallback: assign medium urgency
         return {
             "urgency_score": 50,
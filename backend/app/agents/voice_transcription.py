@@ -2,8 +2,14 @@ import json
 import logging
 from google.generativeai import GenerativeModel
 
+from app.agents.prioritization import _score_to_level, _score_to_wait
+
 logger = logging.getLogger(__name__)
 
+
+class VoiceAgentError(RuntimeError):
+    """The model call failed or returned something unusable (an upstream problem, not the recording)."""
+
 VOICE_EXTRACTION_PROMPT = """You are a medical intake AI for Tandarust AI.
 
 **Task:**
@@ -92,3 +98,196 @@ async def transcribe_audio(
             "symptoms": f"Extraction failed: {str(e)}",
             "raw_transcription": ""
         }
+
+
+# ── Streaming intake ──────────────────────────────────
+SEGMENT_PROMPT = """You are a medical intake AI for Tandarust AI, transcribing a live recording in segments.
+
+**Transcript so far:** {transcript}
+**Symptom summary so far:** {symptoms}
+
+**Task:**
+1. Transcribe exactly what is said in the provided audio segment.
+2. Update the concise clinical symptom summary using the transcript so far plus this segment.
+
+**Output Format:**
+Respond with ONLY valid JSON. No preamble, no markdown code fences.
+{{
+    "transcription": "word-for-word transcription of this segment only",
+    "symptoms": "updated concise clinical symptom summary"
+}}
+"""
+
+FINALIZE_PROMPT = """You are a medical intake AI for Tandarust AI.
+
+From this intake transcript, extract the patient's details if mentioned.
+
+**Transcript:** {transcript}
+
+**Output Format:**
+Respond with ONLY valid JSON. No preamble, no markdown code fences.
+{{
+    "name": "extracted name or null",
+    "age": "extracted age or null",
+    "gender": "extracted gender or null",
+    "symptoms": "concise clinical summary of the symptoms"
+}}
+"""
+
+
+def _parse_json(raw_text: str) -> dict:
+    """Strip markdown fences and parse the model's JSON output."""
+    raw_text = raw_text.strip()
+    if raw_text.startswith("```"):
+        raw_text = raw_text.split("\n", 1)[1] if "\n" in raw_text else raw_text[3:]
+    if raw_text.endswith("```"):
+        raw_text = raw_text[:-3]
+    return json.loads(raw_text.strip())
+
+
+async def transcribe_segment(
+    model: GenerativeModel,
+    audio_bytes: bytes,
+    content_type: str,
+    transcript_so_far: str = "",
+    symptoms_so_far: str = "",
+) -> dict:
+    """
+    Transcribe one streamed audio segment and fold it into the running symptom summary.
+    Returns a dict with transcription and symptoms.
+    """
+    prompt = SEGMENT_PROMPT.format(
+        transcript=transcript_so_far or "(none yet)",
+        symptoms=symptoms_so_far or "(none yet)",
+    )
+    try:
+        response = await model.generate_content_async([
+            prompt,
+            {"mime_type": content_type, "data": audio_bytes},
+        ])
+        try:
+            result = _parse_json(response.text)
+        except json.JSONDecodeError:
+            text = response.text.strip()
+            return {"transcription": text, "symptoms": symptoms_so_far}
+        return {
+            "transcription": result.get("transcription") or "",
+            "symptoms": result.get("symptoms") or symptoms_so_far,
+        }
+    except Exception as e:
+        logger.error(f"Segment transcription error: {e}")
+        return {"transcription": "", "symptoms": symptoms_so_far}
+
+
+async def extract_intake_fields(model: GenerativeModel, transcript: str) -> dict:
+    """
+    Text-only pass over the full transcript to finalize name/age/gender/symptoms.
+    Returns a dict with the same keys as transcribe_audio.
+    """
+    try:
+        response = await model.generate_content_async(
+            FINALIZE_PROMPT.format(transcript=transcript)
+        )
+        result = _parse_json(response.text)
+        return {
+            "name": result.get("name"),
+            "age": result.get("age"),
+            "gender": result.get("gender"),
+            "symptoms": result.get("symptoms") or transcript,
+            "raw_transcription": transcript,
+        }
+    except Exception as e:
+        logger.error(f"Intake field extraction error: {e}")
+        return {
+            "name": None,
+            "age": None,
+            "gender": None,
+            "symptoms": transcript,
+            "raw_transcription": transcript,
+        }
+
+
+# ── One-shot voice → triage ───────────────────────────
+VOICE_TRIAGE_PROMPT = """You are a medical intake and clinical triage AI for Tandarust AI.
+
+**Task:**
+1. Listen to the provided audio of a doctor or patient describing symptoms.
+2. Transcribe exactly what is said as a "raw_transcription".
+3. Extract "name", "age" (integer), "gender" (Male/Female/Other) and a concise clinical "symptoms" summary.
+4. If name, age, gender and symptoms are all present, assess urgency like a triage nurse:
+   - 0-25: Low (routine, non-urgent)
+   - 26-55: Medium (needs attention within 30 min)
+   - 56-80: High (needs attention within 5-10 min)
+   - 81-100: Critical (immediate attention required)
+   Consider red-flag symptoms (chest pain, stroke signs, breathing difficulty, etc.).
+   If any of those fields is missing, set "triage" to null.
+
+**Output Format:**
+Respond with ONLY valid JSON. No preamble, no markdown code fences.
+{
+    "name": "extracted name or null",
+    "age": "extracted age or null",
+    "gender": "extracted gender or null",
+    "symptoms": "extracted clinical symptoms",
+    "raw_transcription": "the full word-for-word transcription",
+    "triage": {
+        "urgency_score": <integer 0-100>,
+        "urgency_level": "<Low|Medium|High|Critical>",
+        "wait_time": "<e.g. Immediate, 5 min, 20 min, 45 min>",
+        "reasoning": "<2-3 sentence clinical reasoning>"
+    }
+}
+"""
+
+
+async def transcribe_and_prioritize(
+    model: GenerativeModel,
+    audio_bytes: bytes,
+    content_type: str = "audio/wav",
+) -> dict:
+    """
+    Fused extraction + prioritization in a single audio call.
+    Returns the transcribe_audio fields plus "priority" (the assess_patient_priority
+    shape) — None when the model could not triage.
+    Raises VoiceAgentError when Gemini fails, so callers don't mistake an outage
+    for a recording with nothing in it.
+    """
+    logger.info(f"🎙️ VOICE TRIAGE AGENT")
+    logger.info(f"   Model: Gemini (Audio + Extraction + Prioritization)")
+    normalized_type = content_type.split(";")[0].strip()
+
+    try:
+        response = await model.generate_content_async([
+            VOICE_TRIAGE_PROMPT,
+            {"mime_type": normalized_type, "data": audio_bytes},
+        ])
+        result = _parse_json(response.text)
+    except Exception as e:
+        logger.error(f"Voice triage agent error: {e}")
+        raise VoiceAgentError(str(e)) from e
+
+    priority = None
+    triage = result.get("triage")
+    if isinstance(triage, dict) and triage.get("urgency_score") is not None:
+        try:
+            score = max(0, min(100, int(triage["urgency_score"])))
+            level = triage.get("urgency_level")
+            if level not in ("Low", "Medium", "High", "Critical"):
+                level = _score_to_level(score)
+            priority = {
+                "urgency_score": score,
+                "urgency_level": level,
+                "wait_time": triage.get("wait_time") or _score_to_wait(score),
+                "reasoning": triage.get("reasoning", ""),
+            }
+        except (TypeError, ValueError):
+            priority = None
+
+    return {
+        "name": result.get("name"),
+        "age": result.get("age"),
+        "gender": result.get("gender"),
+        "symptoms": result.get("symptoms") or result.get("raw_transcription", ""),
+        "raw_transcription": result.get("raw_transcription", ""),
+        "priority": priority,
+    }
@@ -7,10 +7,37 @@ class Settings(BaseSettings):
     SUPABASE_URL: str
     SUPABASE_KEY: str  # anon / public key
     SUPABASE_SERVICE_ROLE_KEY: str
+    SUPABASE_POOL_MAX_CONNECTIONS: int = 50
+    SUPABASE_POOL_KEEPALIVE: int = 20
 
     # ── Google Gemini ──
     GEMINI_API_KEY: str
 
+    # ── Formulary ──
+    FORMULARY_PATH: str = ""  # empty → bundled app/data/formulary.json
+
+    # ── Dashboard stats cache ──
+    DASHBOARD_STATS_TTL: float = 5.0  # seconds served fresh
+    DASHBOARD_STATS_STALE_TTL: float = 60.0  # seconds served stale while refreshing
+
+    # ── Change events (SSE) ──
+    EVENTS_BUFFER_SIZE: int = 1000  # recent events kept for Last-Event-ID resume
+    EVENTS_CLIENT_QUEUE_SIZE: int = 256  # per-client backlog before it is dropped
+    EVENTS_HEARTBEAT: float = 15.0  # seconds between keep-alive comments
+
+    # ── Triage queue ──
+    TRIAGE_QUEUE_RECONCILE_SECONDS: float = 60.0  # rebuild the in-memory index from the DB
+
+    # ── Bulk import ──
+    IMPORT_BATCH_SIZE: int = 500  # rows per multi-row INSERT
+    IMPORT_TRIAGE_CONCURRENCY: int = 4  # parallel prioritization calls (inline / deferred)
+
+    # ── Export ──
+    EXPORT_BATCH_SIZE: int = 1000  # rows per keyset batch when streaming exports
+
+    # ── Audio preprocessing ──
+    AUDIO_WORKERS: int = 2  # process pool size for decode / resample / VAD
+
     # ── CORS ──
     FRONTEND_URL: str = "http://localhost:5173"
 
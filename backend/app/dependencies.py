@@ -8,23 +8,109 @@ Shared dependency providers for FastAPI.
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
 import google.generativeai as genai
+import httpx
+import logging
 
 from app.config import Settings, get_settings
+from app.services.db import run_sync
+
+logger = logging.getLogger(__name__)
 
 # ── Security scheme ───────────────────────────────────
 security = HTTPBearer()
 
 
 # ── Supabase clients ─────────────────────────────────
-def get_supabase(settings: Settings = Depends(get_settings)) -> Client:
-    """Public Supabase client (uses anon key, respects RLS)."""
+# Application-scoped clients, created once in the lifespan and reused by every
+# request so PostgREST / Auth / Storage connections stay warm (keep-alive + HTTP/2).
+_supabase: Client | None = None
+_supabase_admin: Client | None = None
+
+
+def _create_pooled_client(settings: Settings, key: str) -> Client:
+    """Create a Supabase client whose PostgREST session uses a tuned keep-alive HTTP/2 pool."""
     url = settings.SUPABASE_URL.strip().rstrip("/")
-    return create_client(url, settings.SUPABASE_KEY)
+    client = create_client(
+        url,
+        key,
+        options=ClientOptions(auto_refresh_token=False, persist_session=False),
+    )
+
+    # Swap postgrest's default session for a pooled HTTP/2 one (same base URL + headers)
+    default_session = client.postgrest.session
+    client.postgrest.session = httpx.Client(
+        base_url=default_session.base_url,
+        headers=default_session.headers,
+        timeout=default_session.timeout,
+        follow_redirects=True,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SUPABASE_POOL_KEEPALIVE,
+            keepalive_expiry=60.0,
+        ),
+    )
+    default_session.close()
+    return client
+
+
+def _close_client(client: Client) -> None:
+    """Close the HTTP sessions a Supabase client has opened."""
+    sessions = [
+        getattr(client.postgrest, "session", None),
+        getattr(client.auth, "_http_client", None),
+        getattr(getattr(client, "_storage", None), "_client", None),
+    ]
+    for session in sessions:
+        try:
+            if session is not None:
+                session.close()
+        except Exception as e:
+            logger.warning(f"Failed to close Supabase session: {e}")
+
+
+def init_supabase_clients(settings: Settings | None = None) -> None:
+    """Create the shared public + service-role clients (called on startup)."""
+    global _supabase, _supabase_admin
+    settings = settings or get_settings()
+    if _supabase is None:
+        _supabase = _create_pooled_client(settings, settings.SUPABASE_KEY)
+    if _supabase_admin is None:
+        _supabase_admin = _create_pooled_client(settings, settings.SUPABASE_SERVICE_ROLE_KEY)
+
+
+def close_supabase_clients() -> None:
+    """Close the shared clients' connection pools (called on shutdown)."""
+    global _supabase, _supabase_admin
+    for client in (_supabase, _supabase_admin):
+        if client is not None:
+            _close_client(client)
+    _supabase = _supabase_admin = None
+
+
+def get_supabase() -> Client:
+    """Public Supabase client (uses anon key, respects RLS)."""
+    if _supabase is None:
+        init_supabase_clients()
+    return _supabase
 
 
-def get_supabase_admin(settings: Settings = Depends(get_settings)) -> Client:
+def get_supabase_admin() -> Client:
     """Service-role Supabase client (bypasses RLS – use with care)."""
+    if _supabase_admin is None:
+        init_supabase_clients()
+    return _supabase_admin
+
+
+def get_supabase_session_client(settings: Settings = Depends(get_settings)) -> Client:
+    """
+    Per-request service-role client for flows that sign a user in
+    (login / register / refresh / OAuth). Signing in swaps the client's
+    Authorization header to the user's token, so these must never touch
+    the shared admin client.
+    """
     url = settings.SUPABASE_URL.strip().rstrip("/")
     return create_client(url, settings.SUPABASE_SERVICE_ROLE_KEY)
 
@@ -45,16 +131,11 @@ from typing import Dict, Tuple, List, Any
 _auth_cache: Dict[str, Tuple[Any, float]] = {}
 AUTH_CACHE_TTL = 30  # seconds
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    supabase: Client = Depends(get_supabase_admin),
-):
+def verify_token(token: str, supabase: Client):
     """
-    Verify the Bearer token via Supabase and return the user object.
+    Verify a Supabase access token and return the user object.
     Uses a short-lived in-memory cache to deduplicate redundant auth checks.
     """
-    token = credentials.credentials
-    
     # Check cache first
     now = time.time()
     if token in _auth_cache:
@@ -83,6 +164,43 @@ async def get_current_user(
         )
 
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    supabase: Client = Depends(get_supabase_admin),
+):
+    """Verify the Bearer token via Supabase and return the user object."""
+    return await run_sync(verify_token, credentials.credentials, supabase)
+
+
+def resolve_role(user: Any, supabase: Client) -> str:
+    """
+    Look up a user's role.
+    Checks the 'profiles' table first, then falls back to user metadata.
+    """
+    # Prioritize the "profiles" table as the source of truth for the application
+    role = None
+    try:
+        res = (
+            supabase.table("profiles")
+            .select("role")
+            .eq("id", str(user.id))
+            .single()
+            .execute()
+        )
+        if res.data:
+            role = res.data.get("role")
+    except Exception:
+        # Table might not exist or user not in it yet
+        pass
+
+    # Fallback to Supabase Auth metadata
+    if not role and user.user_metadata:
+        role = user.user_metadata.get("role")
+
+    # Default to patient
+    return role or "patient"
+
+
 def role_required(allowed_roles: List[str]):
     """
     Dependency to restrict access based on user roles.
@@ -92,29 +210,7 @@ def role_required(allowed_roles: List[str]):
         current_user: Any = Depends(get_current_user),
         supabase: Client = Depends(get_supabase_admin),
     ):
-        # Prioritize the "profiles" table as the source of truth for the application
-        role = None
-        try:
-            res = (
-                supabase.table("profiles")
-                .select("role")
-                .eq("id", str(current_user.id))
-                .single()
-                .execute()
-            )
-            if res.data:
-                role = res.data.get("role")
-        except Exception:
-            # Table might not exist or user not in it yet
-            pass
-
-        # Fallback to Supabase Auth metadata
-        if not role and current_user.user_metadata:
-            role = current_user.user_metadata.get("role")
-
-        # Default to patient
-        role = role or "patient"
-
+        role = await run_sync(resolve_role, current_user, supabase)
         if role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -9,11 +9,17 @@ import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import get_settings
-from app.routers import auth, patients, prescriptions, dashboard
+from app.dependencies import init_supabase_clients, close_supabase_clients, get_supabase_admin
+from app.routers import auth, patients, prescriptions, dashboard, events
 from app.services.keep_alive import start_keep_alive
+from app.services.formulary import load_formulary
+from app.services.audio_preprocessing import check_ffmpeg, shutdown_audio_pool
+from app.services.db import shutdown_db_executor
+from app.services.triage_queue import load_triage_queue, reconcile_triage_queue
 import asyncio
 
 # ── Logging ───────────────────────────────────────────
@@ -31,12 +37,29 @@ async def lifespan(app: FastAPI):
     
     # Start the keep-alive background task if RENDER_EXTERNAL_URL is set
     asyncio.create_task(start_keep_alive())
+
+    # Shared, pooled Supabase clients for the lifetime of the process
+    init_supabase_clients(settings)
+
+    # Build the drug-name normalization index once, before the first OCR request
+    load_formulary(settings.FORMULARY_PATH or None)
+
+    # Voice intake normalization needs ffmpeg for anything but WAV
+    check_ffmpeg()
+
+    # In-memory triage index, then keep it reconciled with the DB
+    await load_triage_queue(get_supabase_admin())
+    reconcile_task = asyncio.create_task(reconcile_triage_queue(get_supabase_admin()))
     
     logger.info(f"   Supabase URL : {settings.SUPABASE_URL}")
     logger.info(f"   CORS origin  : {settings.FRONTEND_URL}")
     logger.info(f"   Debug mode   : {settings.DEBUG}")
     yield
     logger.info("👋 Shutting down...")
+    reconcile_task.cancel()
+    shutdown_audio_pool()
+    shutdown_db_executor()
+    close_supabase_clients()
 
 
 # ── App ───────────────────────────────────────────────
@@ -48,6 +71,7 @@ app = FastAPI(
     ),
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -63,6 +87,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 
@@ -71,6 +96,7 @@ app.include_router(auth.router, prefix="/api")
 app.include_router(patients.router, prefix="/api")
 app.include_router(prescriptions.router, prefix="/api")
 app.include_router(dashboard.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
 
 
 # ── Health Check ──────────────────────────────────────
@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
 from datetime import datetime
 
+from app.models.prescription import PrescriptionResponse
+
 
 # ── Sub-models ────────────────────────────────────────
 class RiskScore(BaseModel):
@@ -28,6 +30,13 @@ class PatientCreateRequest(BaseModel):
     medical_history: Optional[str] = None
 
 
+class PatientImportRow(PatientCreateRequest):
+    """One row of a bulk import; historical triage fields are optional."""
+    gender: Literal["Male", "Female", "Other"]
+    urgency_score: Optional[int] = Field(default=None, ge=0, le=100)
+    created_at: Optional[datetime] = None  # keep the original registration time
+
+
 # ── Responses ─────────────────────────────────────────
 class PatientResponse(BaseModel):
     id: str
@@ -38,6 +47,10 @@ class PatientResponse(BaseModel):
     urgency_score: int
     urgency_level: str  # Low | Medium | High | Critical
     wait_time: str
+    wait_minutes: Optional[int] = None
+    max_risk_score: Optional[int] = None
+    high_risk: Optional[bool] = None
+    effective_priority: Optional[float] = None  # urgency_score adjusted for time waited
     avatar: str
     history: list[str]
     risk_scores: list[RiskScore]
@@ -48,6 +61,67 @@ class PatientResponse(BaseModel):
         from_attributes = True
 
 
+class PatientDetailResponse(PatientResponse):
+    """Patient with ?include=prescriptions — newest first, capped per request."""
+    prescriptions: Optional[list[PrescriptionResponse]] = None
+    prescriptions_next_cursor: Optional[str] = None  # page on via /patients/{id}/prescriptions?cursor=
+
+
+class PatientListItem(BaseModel):
+    """Sparse patient row for list views — only the requested fields are set."""
+    id: str
+    name: Optional[str] = None
+    age: Optional[int] = None
+    gender: Optional[str] = None
+    symptoms: Optional[str] = None
+    urgency_score: Optional[int] = None
+    urgency_level: Optional[str] = None
+    wait_time: Optional[str] = None
+    wait_minutes: Optional[int] = None
+    max_risk_score: Optional[int] = None
+    high_risk: Optional[bool] = None
+    effective_priority: Optional[float] = None
+    avatar: Optional[str] = None
+    history: Optional[list[str]] = None
+    risk_scores: Optional[list[RiskScore]] = None
+    ai_summary: Optional[AISummary] = None
+    created_at: Optional[str] = None
+
+
 class PatientListResponse(BaseModel):
-    patients: list[PatientResponse]
-    total: int
+    patients: list[PatientListItem]
+    total: Optional[int] = None  # null when listed with count=none
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+
+class PatientSearchHit(PatientListItem):
+    rank: Optional[float] = None  # null when served by the unranked fallback
+
+
+class PatientSearchResponse(BaseModel):
+    patients: list[PatientSearchHit]
+    next_offset: Optional[int] = None  # pass back as ?offset= for the next page
+
+
+class ImportRowError(BaseModel):
+    row: int  # 1-based data row (header excluded)
+    error: str
+
+
+class ImportBatchReport(BaseModel):
+    batch: int
+    first_row: int
+    last_row: int
+    inserted: int
+    failed: int
+    errors: list[ImportRowError]  # first few per batch; `failed` has the full count
+
+
+class PatientImportReport(BaseModel):
+    format: str  # csv | ndjson
+    triage: str  # skip | defer | inline
+    total_rows: int
+    inserted: int
+    failed: int
+    triage_pending: int = 0  # stored rows waiting for the background prioritization pass
+    batches: list[ImportBatchReport]
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+from uuid import UUID
 
 
 # ── Sub-models ────────────────────────────────────────
@@ -8,6 +9,9 @@ class Medication(BaseModel):
     dosage: str
     frequency: str
     duration: str
+    canonical_id: Optional[str] = None  # formulary ID, e.g. RX-PARA
+    generic_name: Optional[str] = None
+    match_confidence: Optional[float] = None  # 0-1
 
 
 # ── Requests ──────────────────────────────────────────
@@ -15,6 +19,11 @@ class PrescriptionStatusUpdate(BaseModel):
     status: str  # Pending | Digitized | Verified
 
 
+class PrescriptionBulkStatusUpdate(BaseModel):
+    ids: list[UUID] = Field(min_length=1, max_length=500)
+    status: Literal["Pending", "Digitized", "Verified"]
+
+
 # ── Responses ─────────────────────────────────────────
 class PrescriptionResponse(BaseModel):
     id: str
@@ -34,4 +43,27 @@ class PrescriptionResponse(BaseModel):
 
 class PrescriptionListResponse(BaseModel):
     prescriptions: list[PrescriptionResponse]
-    total: int
+    total: Optional[int] = None  # null when listed with count=none
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+
+class PrescriptionSearchHit(PrescriptionResponse):
+    rank: Optional[float] = None  # null when served by the unranked fallback
+
+
+class PrescriptionSearchResponse(BaseModel):
+    prescriptions: list[PrescriptionSearchHit]
+    next_offset: Optional[int] = None  # pass back as ?offset= for the next page
+
+
+class BulkStatusResult(BaseModel):
+    id: str
+    result: Literal["updated", "unchanged", "invalid_transition", "not_found"]
+    status: Optional[str] = None  # status after the request (null when not found)
+
+
+class PrescriptionBulkStatusResponse(BaseModel):
+    status: str
+    updated: int
+    results: list[BulkStatusResult]
+    prescriptions: list[PrescriptionResponse]  # the rows that changed
@@ -6,7 +6,7 @@ Supports email/password registration, login, token refresh, Google OAuth, and pr
 from fastapi import APIRouter, Depends, HTTPException, status
 from supabase import Client
 
-from app.dependencies import get_supabase_admin, get_current_user
+from app.dependencies import get_supabase_admin, get_supabase_session_client, get_current_user
 from app.models.auth import (
     RegisterRequest,
     LoginRequest,
@@ -25,7 +25,7 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 @router.post("/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     body: RegisterRequest,
-    supabase: Client = Depends(get_supabase_admin),
+    supabase: Client = Depends(get_supabase_session_client),
 ):
     """Register a new user with email, password, name, and role."""
     try:
@@ -83,7 +83,7 @@ async def register(
 @router.post("/login", response_model=AuthResponse)
 async def login(
     body: LoginRequest,
-    supabase: Client = Depends(get_supabase_admin),
+    supabase: Client = Depends(get_supabase_session_client),
 ):
     """Login with email and password."""
     try:
@@ -151,7 +151,7 @@ async def login(
 @router.post("/refresh", response_model=AuthTokens)
 async def refresh_token(
     body: RefreshRequest,
-    supabase: Client = Depends(get_supabase_admin),
+    supabase: Client = Depends(get_supabase_session_client),
 ):
     """Refresh an expired access token."""
     try:
@@ -181,7 +181,7 @@ async def refresh_token(
 
 @router.get("/oauth/google", response_model=OAuthURLResponse)
 async def google_oauth(
-    supabase: Client = Depends(get_supabase_admin),
+    supabase: Client = Depends(get_supabase_session_client),
     settings: Settings = Depends(get_settings),
 ):
     """Get the Google OAuth sign-in URL. Frontend should redirect to this URL."""
@@ -2,18 +2,20 @@
 Dashboard Router — Aggregate stats for the doctor dashboard.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from supabase import Client
 
 from app.dependencies import get_supabase_admin, get_current_user, role_required
 from app.models.dashboard import DashboardStats
 from app.services import dashboard_service
+from app.services.etag import content_etag, conditional_json
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
 
 @router.get("/stats", response_model=DashboardStats)
 async def get_stats(
+    request: Request,
     current_user=Depends(role_required(["doctor", "admin"])),
     supabase: Client = Depends(get_supabase_admin),
 ):
@@ -21,6 +23,9 @@ async def get_stats(
     Returns aggregated dashboard statistics:
     - total_patients, critical_patients, pending_reviews
     - avg_wait_time, prescriptions_today, risk_alerts
+
+    Served from a short-lived cache shared by all pollers; unchanged stats
+    answer If-None-Match with 304.
     """
-    stats = await dashboard_service.get_dashboard_stats(supabase)
-    return DashboardStats(**stats)
+    stats = await dashboard_service.get_cached_dashboard_stats(supabase)
+    return conditional_json(request, content_etag(stats), lambda: DashboardStats(**stats).model_dump())
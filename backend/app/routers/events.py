@@ -0,0 +1,95 @@
+"""
+Events Router — Server-Sent Events stream of patient/prescription changes.
+"""
+
+import asyncio
+import logging
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from supabase import Client
+
+from app.config import get_settings
+from app.dependencies import get_supabase_admin, verify_token, resolve_role
+from app.services.db import run_sync
+from app.services.events import get_event_hub
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+EVENT_TABLES = {"patients", "prescriptions"}
+
+
+def _sse(event: dict) -> bytes:
+    return b"id: %s\ndata: %s\n\n" % (event["id"].encode(), orjson.dumps(event))
+
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    token: str = Query(..., description="Access token (EventSource cannot send headers)"),
+    tables: str | None = Query(default=None, description="Comma-separated: patients, prescriptions"),
+    last_event_id: str | None = Query(
+        default=None, max_length=64, pattern=r"^[0-9a-f]+-\d+$", description="Resume after this event id",
+    ),
+    last_event_id_header: str | None = Header(default=None, alias="Last-Event-ID"),
+    supabase: Client = Depends(get_supabase_admin),
+):
+    """
+    Live change feed (text/event-stream) for doctors/admins.
+
+    Each message is {id, table, op, row_id, fields} with op insert | update | delete
+    and only the changed fields. Reconnects resume from Last-Event-ID or
+    ?last_event_id= (clients that rebuild the URL with a fresh token); if that point is no longer buffered,
+    or the id comes from another boot or worker, the stream starts with a `reset` event and the client
+    should refetch.
+    """
+    user = await run_sync(verify_token, token, supabase)
+    role = await run_sync(resolve_role, user, supabase)
+    if role not in ("doctor", "admin"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied.")
+
+    selected = None
+    if tables:
+        selected = {t.strip() for t in tables.split(",") if t.strip()}
+        if not selected <= EVENT_TABLES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown table(s). Allowed: {', '.join(sorted(EVENT_TABLES))}",
+            )
+
+    if last_event_id_header:
+        last_event_id = last_event_id_header[:64]
+
+    hub = get_event_hub()
+    sub, backlog = hub.subscribe(selected, last_event_id)
+    heartbeat = get_settings().EVENTS_HEARTBEAT
+
+    async def stream():
+        try:
+            yield b"retry: 3000\n\n"
+            if backlog is None:
+                yield b"id: %s\nevent: reset\ndata: {}\n\n" % hub.last_id.encode()
+            else:
+                for event in backlog:
+                    yield _sse(event)
+
+            while not await request.is_disconnected():
+                if sub.overflowed and sub.queue.empty():
+                    break  # dropped for falling behind; client reconnects and resumes
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                yield _sse(event)
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -3,19 +3,72 @@ Patient Router — CRUD + AI triage pipeline.
 """
 
 import json
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+import re
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from supabase import Client
 from google.generativeai import GenerativeModel
 
-from app.dependencies import get_supabase_admin, get_current_user, get_gemini_model, role_required
-from app.models.patient import PatientCreateRequest, PatientResponse, PatientListResponse
-from app.services import patient_service
+from app.config import get_settings
+from app.dependencies import (
+    get_supabase_admin,
+    get_current_user,
+    get_gemini_model,
+    role_required,
+    verify_token,
+    resolve_role,
+)
+from app.models.prescription import PrescriptionListResponse
+from app.models.patient import (
+    PatientCreateRequest,
+    PatientResponse,
+    PatientDetailResponse,
+    PatientListResponse,
+    PatientListItem,
+    PatientSearchResponse,
+    PatientImportReport,
+)
+from app.services import patient_service, prescription_service, patient_import, export
+from app.services.db import run_sync
+from app.services.etag import row_set_etag, conditional_json
+from app.services.triage_queue import get_triage_queue
+from app.services.events import publish_change
+from app.services.priority import row_effective_priority, etag_bucket
+from app.routers.prescriptions import _format_prescription
 from app.agents.prioritization import assess_patient_priority
 from app.agents.risk_analyzer import analyze_risks
 from app.agents.summary import generate_summary
-from app.agents.voice_transcription import transcribe_audio
+from app.agents.voice_transcription import (
+    transcribe_audio,
+    transcribe_segment,
+    extract_intake_fields,
+    transcribe_and_prioritize,
+    VoiceAgentError,
+)
+from app.services.audio_preprocessing import normalize_audio, encode_segment, PauseSegmenter, TARGET_SAMPLE_RATE
 
 router = APIRouter(prefix="/patients", tags=["Patients"])
+logger = logging.getLogger(__name__)
+
+# Hard cap on a single streamed recording (16 kHz mono int16)
+MAX_STREAM_BYTES = TARGET_SAMPLE_RATE * 2 * 60 * 10  # 10 minutes
+
+# Relaxed validation to handle codecs (e.g., 'audio/webm;codecs=opus')
+ALLOWED_AUDIO_TYPES = ["audio/wav", "audio/mpeg", "audio/webm", "audio/ogg", "audio/x-wav", "audio/mp3"]
+
+
+def _validate_audio_type(content_type: str | None) -> None:
+    if not content_type or not any(t in content_type for t in ALLOWED_AUDIO_TYPES):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid audio format '{content_type}'. Supported: WAV, MP3, WebM, OGG.",
+        )
+
 
 @router.post("/transcribe-voice")
 async def transcribe_voice(
@@ -26,67 +79,208 @@ async def transcribe_voice(
     """
     Transcribe patient symptoms from audio file using Gemini.
     """
-    # Relaxed validation to handle codecs (e.g., 'audio/webm;codecs=opus')
-    allowed_types = ["audio/wav", "audio/mpeg", "audio/webm", "audio/ogg", "audio/x-wav", "audio/mp3"]
-    if not any(t in file.content_type for t in allowed_types):
-         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid audio format '{file.content_type}'. Supported: WAV, MP3, WebM, OGG.",
-        )
-    
+    _validate_audio_type(file.content_type)
     audio_bytes = await file.read()
+
+    # Mono 16 kHz, silence trimmed, compact encoding — dead air no longer costs tokens
+    audio_bytes, content_type = await normalize_audio(audio_bytes, file.content_type)
+
     result = await transcribe_audio(
         model=gemini,
         audio_bytes=audio_bytes,
-        content_type=file.content_type
+        content_type=content_type
     )
     
     return result
 
 
-def _make_avatar(name: str) -> str:
-    """Generate initials from a name, e.g. 'Ahmed Khan' → 'AK'."""
-    parts = name.strip().split()
-    if len(parts) >= 2:
-        return (parts[0][0] + parts[-1][0]).upper()
-    return name[:2].upper() if name else "??"
+@router.websocket("/voice-stream")
+async def voice_stream(
+    websocket: WebSocket,
+    token: str = Query(...),
+    supabase: Client = Depends(get_supabase_admin),
+    gemini: GenerativeModel = Depends(get_gemini_model),
+):
+    """
+    Streaming voice intake.
 
+    Protocol:
+    - Connect with ?token=<access token> (doctor/admin only).
+    - Send 16 kHz mono int16 PCM as binary frames while recording.
+    - Send {"type": "stop"} when the doctor stops speaking.
+    - Server pushes {"type": "partial", symptoms, raw_transcription} as each
+      pause-delimited segment is transcribed, then one {"type": "final", name,
+      age, gender, symptoms, raw_transcription} before closing.
+    """
+    try:
+        user = await run_sync(verify_token, token, supabase)
+        role = await run_sync(resolve_role, user, supabase)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if role not in ("doctor", "admin"):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
 
-def _format_patient(row: dict) -> PatientResponse:
-    """Convert a DB row dict to a PatientResponse."""
-    
-    summary = row.get("ai_summary", "")
-    # Handle if ai_summary is stored as a JSON string or a dict
-    if isinstance(summary, str) and (summary.startswith("{") or summary.startswith("[")):
+    await websocket.accept()
+
+    segmenter = PauseSegmenter()
+    segments: asyncio.Queue = asyncio.Queue()
+    transcript: list[str] = []
+    symptoms = ""
+
+    async def transcribe_segments():
+        """Transcribe segments in arrival order so each one sees the context before it."""
+        nonlocal symptoms
+        index = 0
+        while (pcm := await segments.get()) is not None:
+            audio_bytes, content_type = await encode_segment(pcm)
+            result = await transcribe_segment(
+                gemini, audio_bytes, content_type,
+                transcript_so_far=" ".join(transcript),
+                symptoms_so_far=symptoms,
+            )
+            if result["transcription"]:
+                transcript.append(result["transcription"])
+            symptoms = result["symptoms"]
+            index += 1
+            await websocket.send_json({
+                "type": "partial",
+                "segment": index,
+                "symptoms": symptoms,
+                "raw_transcription": " ".join(transcript),
+            })
+
+    worker = asyncio.create_task(transcribe_segments())
+    received = 0
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            if message.get("bytes"):
+                received += len(message["bytes"])
+                if received > MAX_STREAM_BYTES:
+                    await websocket.send_json({"type": "error", "detail": "Recording too long."})
+                    break
+                for segment in segmenter.feed(message["bytes"]):
+                    segments.put_nowait(segment)
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except json.JSONDecodeError:
+                    continue
+                if control.get("type") == "stop":
+                    break
+
+        tail = segmenter.flush()
+        if tail:
+            segments.put_nowait(tail)
+        segments.put_nowait(None)
+        await worker
+
+        # Structured fields are finalized once, from the whole transcript (text-only call)
+        full_transcript = " ".join(transcript)
+        if full_transcript:
+            final = await extract_intake_fields(gemini, full_transcript)
+        else:
+            final = {"name": None, "age": None, "gender": None, "symptoms": "", "raw_transcription": ""}
+        await websocket.send_json({"type": "final", **final})
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        logger.info("Voice stream closed by client before finalizing.")
+        worker.cancel()
+    except Exception as e:
+        logger.error(f"Voice stream error: {e}", exc_info=True)
+        worker.cancel()
         try:
-            summary = json.loads(summary)
-        except:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        except RuntimeError:
             pass
-            
-    # If it's a simple string (old data), wrap it in the new format for the UI
-    if isinstance(summary, str):
-        summary = {
-            "clinical_summary_en": summary,
-            "clinical_summary_ur": "قدیم ڈیٹا کیلئے خلاصہ دستیاب نہیں ہے۔",
-            "patient_friendly_summary": "Legacy summary data.",
-            "suggested_actions": ["Review legacy data"]
-        }
 
-    return PatientResponse(
-        id=str(row["id"]),
-        name=row["name"],
-        age=row["age"],
-        gender=row["gender"],
-        symptoms=row["symptoms"],
-        urgency_score=row["urgency_score"],
-        urgency_level=row["urgency_level"],
-        wait_time=row["wait_time"],
-        avatar=row.get("avatar", ""),
-        history=row.get("history", []),
-        risk_scores=row.get("risk_scores", []),
-        ai_summary=summary,
-        created_at=str(row.get("created_at", "")),
-    )
+
+def _format_risk_score(rs: dict) -> dict:
+    return {
+        "condition": rs.get("condition"),
+        "score": rs.get("score"),
+        "level": rs.get("level"),
+        "reason": rs.get("reason"),
+    }
+
+
+def _format_patient(row: dict) -> dict:
+    """Convert a trusted DB row to the PatientResponse JSON shape (no model validation)."""
+    return {
+        "id": str(row["id"]),
+        "name": row["name"],
+        "age": row["age"],
+        "gender": row["gender"],
+        "symptoms": row["symptoms"],
+        "urgency_score": row["urgency_score"],
+        "urgency_level": row["urgency_level"],
+        "wait_time": row["wait_time"],
+        "wait_minutes": row.get("wait_minutes"),
+        "max_risk_score": row.get("max_risk_score"),
+        "high_risk": row.get("high_risk"),
+        "effective_priority": row_effective_priority(row),
+        "avatar": row.get("avatar") or "",
+        "history": row.get("history") or [],
+        "risk_scores": [_format_risk_score(rs) for rs in row.get("risk_scores") or []],
+        "ai_summary": row.get("ai_summary"),  # JSONB, already in AISummary shape
+        "created_at": str(row["created_at"]) if row.get("created_at") else None,
+    }
+
+
+# ── List projection ───────────────────────────────────
+# What the triage list renders; the full record stays on GET /patients/{id}
+DEFAULT_LIST_FIELDS = (
+    "id", "name", "avatar", "urgency_score", "urgency_level", "wait_time", "wait_minutes",
+    "effective_priority", "created_at",
+)
+LIST_FIELDS = tuple(PatientListItem.model_fields)
+# Derived per row rather than selected from the table
+COMPUTED_FIELDS = {"effective_priority"}
+# Columns effective_priority is derived from
+PRIORITY_INPUTS = ("urgency_score", "created_at", "wait_minutes")
+
+
+def _select_columns(selected: tuple[str, ...]) -> tuple[str, ...]:
+    """Table columns needed to build the selected fields."""
+    columns = tuple(f for f in selected if f not in COMPUTED_FIELDS)
+    if "effective_priority" in selected:
+        columns = tuple(dict.fromkeys([*columns, *PRIORITY_INPUTS]))
+    return columns
+
+
+def _parse_fields(fields: str | None) -> tuple[str, ...]:
+    """Resolve ?fields= into a column list ("*" = every field, default = compact list)."""
+    if not fields:
+        return DEFAULT_LIST_FIELDS
+    if fields.strip() == "*":
+        return LIST_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(LIST_FIELDS)}",
+        )
+    return tuple(dict.fromkeys(["id", *requested]))
+
+
+def _format_patient_fields(row: dict, fields: tuple[str, ...]) -> dict:
+    """Build a sparse list item holding only the selected fields."""
+    values = {f: row.get(f) for f in fields}
+    values["id"] = str(row["id"])
+    if "effective_priority" in values:
+        values["effective_priority"] = row_effective_priority(row)
+    if values.get("risk_scores") is not None:
+        values["risk_scores"] = [_format_risk_score(rs) for rs in values["risk_scores"]]
+    if values.get("created_at") is not None:
+        values["created_at"] = str(values["created_at"])
+    return values
 
 
 @router.post("", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
@@ -103,9 +297,86 @@ async def create_patient(
     3. Summary Agent → doctor-ready AI summary
     4. Store in DB → return complete patient record
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    
+    return await _run_triage_pipeline(body, current_user, supabase, gemini)
+
+
+@router.post("/voice-intake", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
+async def voice_intake(
+    file: UploadFile = File(...),
+    current_user=Depends(role_required(["doctor", "admin"])),
+    supabase: Client = Depends(get_supabase_admin),
+    gemini: GenerativeModel = Depends(get_gemini_model),
+):
+    """
+    One-shot voice intake: audio → transcription + prioritization (one call)
+    → risk analysis → summary → DB insert → complete patient record.
+
+    If the recording does not mention name, age, gender and symptoms, responds
+    422 with the partial extraction so the client can fall back to the form.
+    Responds 502 when the transcription model itself fails.
+    """
+    _validate_audio_type(file.content_type)
+    audio_bytes = await file.read()
+    audio_bytes, content_type = await normalize_audio(audio_bytes, file.content_type)
+
+    try:
+        extracted = await transcribe_and_prioritize(
+            model=gemini,
+            audio_bytes=audio_bytes,
+            content_type=content_type,
+        )
+    except VoiceAgentError:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Voice transcription service failed. Please try again.",
+        )
+
+    body = _intake_to_request(extracted)
+    if body is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={
+                "message": "Recording is missing required patient details.",
+                "extracted": {k: v for k, v in extracted.items() if k != "priority"},
+            },
+        )
+
+    return await _run_triage_pipeline(
+        body, current_user, supabase, gemini, priority=extracted.get("priority")
+    )
+
+
+def _intake_to_request(extracted: dict) -> PatientCreateRequest | None:
+    """Build a PatientCreateRequest from voice extraction, or None if a field is missing."""
+    name = (extracted.get("name") or "").strip()
+    symptoms = (extracted.get("symptoms") or "").strip()
+
+    age_digits = "".join(re.findall(r"\d+", str(extracted.get("age") or "")))
+    age = int(age_digits) if age_digits else None
+
+    gender_str = str(extracted.get("gender") or "").strip().lower()
+    gender = None
+    if gender_str in ("m", "male", "man", "boy"):
+        gender = "Male"
+    elif gender_str in ("f", "female", "woman", "girl"):
+        gender = "Female"
+    elif gender_str in ("other", "non-binary", "nonbinary"):
+        gender = "Other"
+
+    if not name or name.lower() == "null" or age is None or not gender or not symptoms:
+        return None
+    return PatientCreateRequest(name=name, age=age, gender=gender, symptoms=symptoms)
+
+
+async def _run_triage_pipeline(
+    body: PatientCreateRequest,
+    current_user,
+    supabase: Client,
+    gemini: GenerativeModel,
+    priority: dict | None = None,
+) -> PatientResponse:
+    """Run the triage agents, store the patient, and return the formatted record.
+    A precomputed `priority` (e.g. from voice intake) skips the prioritization call."""
     logger.info(f"═══════════════════════════════════════════════════════════")
     logger.info(f"📋 CREATE PATIENT REQUEST")
     logger.info(f"   Patient: {body.name}, Age: {body.age}")
@@ -122,15 +393,18 @@ async def create_patient(
     try:
         # ── Step 1: Prioritization ──
         logger.info(f"\n1️⃣  STEP 1: PATIENT PRIORITIZATION")
-        priority = await assess_patient_priority(
-            model=gemini,
-            name=body.name,
-            age=body.age,
-            gender=body.gender,
-            symptoms=body.symptoms,
-            history=history,
-        )
-        logger.info(f"   ✅ Priority result: {priority}")
+        if priority is None:
+            priority = await assess_patient_priority(
+                model=gemini,
+                name=body.name,
+                age=body.age,
+                gender=body.gender,
+                symptoms=body.symptoms,
+                history=history,
+            )
+            logger.info(f"   ✅ Priority result: {priority}")
+        else:
+            logger.info(f"   ✅ Priority reused from intake call: {priority}")
 
         # ── Step 2: Risk Analysis ──
         logger.info(f"\n2️⃣  STEP 2: RISK ANALYSIS")
@@ -167,7 +441,7 @@ async def create_patient(
             "symptoms": body.symptoms,
             "history": history,
             "medical_history": body.medical_history, 
-            "avatar": _make_avatar(body.name),
+            "avatar": patient_service.make_avatar(body.name),
             "urgency_score": priority["urgency_score"],
             "urgency_level": priority["urgency_level"],
             "wait_time": priority["wait_time"],
@@ -206,28 +480,268 @@ async def create_patient(
 
 @router.get("", response_model=PatientListResponse)
 async def list_patients(
+    request: Request,
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page (overrides offset)"),
+    count: Literal["exact", "planned", "estimated", "none"] = Query(
+        default="exact", description="How `total` is computed; 'none' skips counting"
+    ),
+    fields: str | None = Query(
+        default=None,
+        description="Comma-separated fields to return, or '*' for full records. "
+                    "Defaults to the compact triage-list projection.",
+    ),
+    urgency_level: list[Literal["Low", "Medium", "High", "Critical"]] | None = Query(
+        default=None, description="Repeat to match any of several levels"
+    ),
+    created_after: datetime | None = Query(default=None, description="created_at >= this"),
+    created_before: datetime | None = Query(default=None, description="created_at < this"),
+    created_by: UUID | None = Query(default=None, description="Doctor who registered the patient"),
     current_user=Depends(role_required(["doctor", "admin"])),
     supabase: Client = Depends(get_supabase_admin),
 ):
-    """List all patients sorted by urgency (highest first)."""
-    rows, total = await patient_service.get_patients(supabase, limit, offset)
-    patients = [_format_patient(r) for r in rows]
-    return PatientListResponse(patients=patients, total=total)
+    """
+    List patients in static triage order (most urgent first, then oldest) — the
+    whole table, paged. The wait-aware order of waiting patients is GET /patients/queue.
+    Supports If-None-Match.
+    """
+    selected = _parse_fields(fields)
+    filters = {
+        "urgency_level": urgency_level,
+        "created_at_from": created_after,
+        "created_at_to": created_before,
+        "created_by": created_by,
+    }
+    try:
+        rows, total, next_cursor = await patient_service.get_patients(
+            supabase, limit, offset, cursor, count_mode=count,
+            columns=_select_columns(selected),
+            filters=filters,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # effective_priority moves with the clock, so it puts a time bucket into the ETag
+    bucket = etag_bucket(rows) if "effective_priority" in selected else None
+    etag = row_set_etag(rows, selected, filters, limit, offset, cursor, total, next_cursor, bucket)
+    # Trusted DB rows: serialize straight to JSON, skipping response_model re-validation
+    return conditional_json(request, etag, lambda: {
+        "patients": [_format_patient_fields(r, selected) for r in rows],
+        "total": total,
+        "next_cursor": next_cursor,
+    })
+
+
+@router.post("/import", response_model=PatientImportReport)
+async def import_patients(
+    file: UploadFile = File(..., description="CSV with a header row, or NDJSON (one object per line)"),
+    fmt: Literal["csv", "ndjson"] | None = Query(
+        default=None, alias="format", description="Defaults to the file extension / content type"
+    ),
+    triage: Literal["skip", "defer", "inline"] = Query(
+        default="skip",
+        description="skip: store as-is · defer: prioritize in the background · inline: prioritize before insert "
+                    "(defer/inline make one model call per row)",
+    ),
+    batch_size: int | None = Query(default=None, ge=1, le=1000, description="Rows per INSERT (default IMPORT_BATCH_SIZE)"),
+    current_user=Depends(role_required(["doctor", "admin"])),
+    supabase: Client = Depends(get_supabase_admin),
+    gemini: GenerativeModel = Depends(get_gemini_model),
+):
+    """
+    Bulk-load historical patients. Columns/keys follow PatientCreateRequest
+    (name, age, gender, symptoms, history, medical_history) plus optional
+    urgency_score and created_at; CSV history is ';'-separated.
+    Returns a per-batch report of inserted rows and row-level errors.
+    """
+    fmt = fmt or patient_import.detect_format(file.filename, file.content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unrecognized file type; upload .csv or .ndjson, or pass ?format=.",
+        )
+    try:
+        report = await patient_import.import_patients(
+            supabase,
+            file.file,
+            fmt,
+            triage,
+            batch_size or get_settings().IMPORT_BATCH_SIZE,
+            user_id=str(current_user.id),
+            gemini=gemini,
+        )
+    except patient_import.ImportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ValueError as e:
+        # patients table missing — a server-side problem, not the upload's
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    if report["inserted"]:
+        publish_change("patients", "import", "*", {"inserted": report["inserted"]})
+    if report["triage_pending"]:
+        patient_import.start_deferred_triage(supabase, gemini)
+    return ORJSONResponse(report)
+
+
+@router.get("/export")
+async def export_patients(
+    fmt: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    fields: str | None = Query(default=None, description="Comma-separated fields (default: all)"),
+    urgency_level: list[Literal["Low", "Medium", "High", "Critical"]] | None = Query(default=None),
+    created_after: datetime | None = Query(default=None, description="created_at >= this"),
+    created_before: datetime | None = Query(default=None, description="created_at < this"),
+    current_user=Depends(role_required(["doctor", "admin"])),
+    supabase: Client = Depends(get_supabase_admin),
+):
+    """Stream every matching patient (oldest first) as NDJSON or CSV."""
+    selected = _parse_fields(fields or "*")
+    rows = export.iter_rows(
+        supabase, "patients", _select_columns(selected),
+        filters={"urgency_level": urgency_level, "created_at_from": created_after, "created_at_to": created_before},
+    )
+    filename = f"patients-{datetime.now():%Y%m%d-%H%M%S}.{fmt}"
+    return StreamingResponse(
+        export.encode(rows, fmt, selected, lambda r: _format_patient_fields(r, selected)),
+        media_type=export.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
-@router.get("/{patient_id}", response_model=PatientResponse)
+@router.get("/search", response_model=PatientSearchResponse)
+async def search_patients(
+    q: str = Query(..., min_length=2, max_length=200, description="Name or symptoms; typos in names are tolerated"),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    fields: str | None = Query(default=None, description="As for GET /patients"),
+    current_user=Depends(role_required(["doctor", "admin"])),
+    supabase: Client = Depends(get_supabase_admin),
+):
+    """Ranked full-text search over names and symptoms, with fuzzy name matching."""
+    selected = _parse_fields(fields)
+    rows, has_more = await patient_service.search_patients(supabase, q.strip(), limit, offset)
+    return ORJSONResponse({
+        "patients": [{**_format_patient_fields(r, selected), "rank": r["rank"]} for r in rows],
+        "next_offset": offset + limit if has_more else None,
+    })
+
+
+@router.get("/next", response_model=PatientListItem)
+async def next_patient(
+    current_user=Depends(role_required(["doctor", "admin"])),
+):
+    """The highest-priority waiting patient, from the in-memory triage index."""
+    patient = get_triage_queue().peek()
+    if patient is None:
+        raise HTTPException(status_code=404, detail="No patients waiting.")
+    return ORJSONResponse(patient)
+
+
+@router.get("/queue", response_model=PatientListResponse)
+async def triage_queue(
+    request: Request,
+    top: int = Query(default=10, ge=1, le=100),
+    fields: str | None = Query(
+        default=None,
+        description="Comma-separated fields to return, or '*' for full records. "
+                    "Defaults to the queue's own columns (no database read).",
+    ),
+    current_user=Depends(role_required(["doctor", "admin"])),
+    supabase: Client = Depends(get_supabase_admin),
+):
+    """
+    The `top` highest-priority waiting patients in wait-aware triage order, from
+    the in-memory index. With `fields`, their rows are read by id (one query) so
+    dashboards get full records in queue order. Supports If-None-Match.
+    """
+    queue = get_triage_queue()
+    ranked = queue.top(top)
+    if not fields:
+        return ORJSONResponse({"patients": ranked, "total": len(queue), "next_cursor": None})
+
+    selected = _parse_fields(fields)
+    rows = await patient_service.get_patients_by_ids(
+        supabase, [p["id"] for p in ranked], _select_columns(selected)
+    )
+    # The queue's value (as of its ranking bucket) keeps the order and the numbers consistent
+    priority = {p["id"]: p["effective_priority"] for p in ranked}
+    etag = row_set_etag(rows, selected, top, len(queue), [priority[str(r["id"])] for r in rows])
+
+    def build() -> dict:
+        patients = [_format_patient_fields(r, selected) for r in rows]
+        for item in patients:
+            if "effective_priority" in item:
+                item["effective_priority"] = priority[item["id"]]
+        return {"patients": patients, "total": len(queue), "next_cursor": None}
+
+    return conditional_json(request, etag, build)
+
+
+@router.get("/{patient_id}", response_model=PatientDetailResponse)
 async def get_patient(
     patient_id: str,
+    request: Request,
+    include: Literal["prescriptions"] | None = Query(
+        default=None, description="'prescriptions' embeds the newest prescriptions in the same query"
+    ),
+    prescriptions_limit: int = Query(default=20, ge=1, le=200),
     current_user=Depends(get_current_user),
     supabase: Client = Depends(get_supabase_admin),
 ):
-    """Get a single patient by ID."""
-    row = await patient_service.get_patient_by_id(supabase, patient_id)
+    """Get a single patient by ID. Supports If-None-Match."""
+    if include == "prescriptions":
+        # Same rule as GET /prescriptions; only checked when the embed is asked for
+        role = await run_sync(resolve_role, current_user, supabase)
+        if role not in ("doctor", "admin"):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied.")
+    row = await patient_service.get_patient_by_id(
+        supabase, patient_id, prescriptions_limit if include == "prescriptions" else 0
+    )
     if not row:
         raise HTTPException(status_code=404, detail="Patient not found.")
-    return _format_patient(row)
+    if include != "prescriptions":
+        return conditional_json(request, row_set_etag([row], etag_bucket([row])), lambda: _format_patient(row))
+
+    def build() -> dict:
+        return {
+            **_format_patient(row),
+            "prescriptions": [_format_prescription(p) for p in row["prescriptions"]],
+            "prescriptions_next_cursor": row["prescriptions_next_cursor"],
+        }
+
+    etag = row_set_etag([row, *row["prescriptions"]], include, prescriptions_limit, etag_bucket([row]))
+    return conditional_json(request, etag, build)
+
+
+@router.get("/{patient_id}/prescriptions", response_model=PrescriptionListResponse)
+async def list_patient_prescriptions(
+    patient_id: UUID,
+    request: Request,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+    count: Literal["exact", "planned", "estimated", "none"] = Query(default="none"),
+    current_user=Depends(role_required(["doctor", "admin"])),
+    supabase: Client = Depends(get_supabase_admin),
+):
+    """
+    One patient's prescriptions, newest first (keyset over idx_prescriptions_patient_keyset).
+    404 if the patient does not exist, as for GET /patients/{id}.
+    """
+    filters = {"patient_id": patient_id}
+    try:
+        rows, total, next_cursor = await prescription_service.get_prescriptions(
+            supabase, limit, 0, cursor, count_mode=count, filters=filters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Any row proves the patient exists (foreign key); only an empty page needs the probe
+    if not rows and not await patient_service.patient_exists(supabase, str(patient_id)):
+        raise HTTPException(status_code=404, detail="Patient not found.")
+    etag = row_set_etag(rows, filters, limit, cursor, total, next_cursor)
+    return conditional_json(request, etag, lambda: {
+        "prescriptions": [_format_prescription(r) for r in rows],
+        "total": total,
+        "next_cursor": next_cursor,
+    })
 
 
 @router.delete("/{patient_id}", status_code=status.HTTP_204_NO_CONTENT)
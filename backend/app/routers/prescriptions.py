@@ -2,7 +2,11 @@
 Prescription Router — Upload, digitize, list, update status.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File, Form
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from supabase import Client
 from google.generativeai import GenerativeModel
 
@@ -11,8 +15,12 @@ from app.models.prescription import (
     PrescriptionResponse,
     PrescriptionListResponse,
     PrescriptionStatusUpdate,
+    PrescriptionBulkStatusUpdate,
+    PrescriptionBulkStatusResponse,
+    PrescriptionSearchResponse,
 )
-from app.services import prescription_service
+from app.services import prescription_service, export
+from app.services.etag import row_set_etag, conditional_json
 from app.agents.prescription_ocr import digitize_prescription
 
 router = APIRouter(prefix="/prescriptions", tags=["Prescriptions"])
@@ -20,30 +28,33 @@ router = APIRouter(prefix="/prescriptions", tags=["Prescriptions"])
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp", "image/heic", "image/heif"}
 
 
-def _format_prescription(row: dict) -> PrescriptionResponse:
-    """Convert a DB row dict to a PrescriptionResponse."""
+def _format_prescription(row: dict) -> dict:
+    """Convert a trusted DB row to the PrescriptionResponse JSON shape (no model validation)."""
     medications = []
-    for med in row.get("medications", []):
+    for med in row.get("medications") or []:
         if isinstance(med, dict):
             medications.append({
                 "drug": med.get("drug") or med.get("name") or "Unknown",
                 "dosage": med.get("dosage") or "N/A",
                 "frequency": med.get("frequency") or "N/A",
                 "duration": med.get("duration") or "N/A",
+                "canonical_id": med.get("canonical_id"),
+                "generic_name": med.get("generic_name"),
+                "match_confidence": med.get("match_confidence"),
             })
 
-    return PrescriptionResponse(
-        id=str(row["id"]),
-        patient_name=row["patient_name"],
-        date=str(row["date"]),
-        medications=medications,
-        status=row["status"],
-        extracted_patient_name=row.get("extracted_patient_name"),
-        extracted_age=row.get("extracted_age"),
-        extracted_gender=row.get("extracted_gender"),
-        image_url=row.get("image_url"),
-        created_at=str(row.get("created_at")) if row.get("created_at") else None,
-    )
+    return {
+        "id": str(row["id"]),
+        "patient_name": row["patient_name"],
+        "date": str(row["date"]),
+        "medications": medications,
+        "status": row["status"],
+        "extracted_patient_name": row.get("extracted_patient_name"),
+        "extracted_age": row.get("extracted_age"),
+        "extracted_gender": row.get("extracted_gender"),
+        "image_url": row.get("image_url"),
+        "created_at": str(row["created_at"]) if row.get("created_at") else None,
+    }
 
 
 @router.post("/digitize", response_model=PrescriptionResponse, status_code=status.HTTP_201_CREATED)
@@ -122,15 +133,100 @@ async def digitize_and_create(
 
 @router.get("", response_model=PrescriptionListResponse)
 async def list_prescriptions(
+    request: Request,
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page (overrides offset)"),
+    count: Literal["exact", "planned", "estimated", "none"] = Query(
+        default="exact", description="How `total` is computed; 'none' skips counting"
+    ),
+    status_filter: list[Literal["Pending", "Digitized", "Verified"]] | None = Query(
+        default=None, alias="status", description="Repeat to match any of several statuses"
+    ),
+    patient_id: UUID | None = Query(default=None),
+    created_after: datetime | None = Query(default=None, description="created_at >= this"),
+    created_before: datetime | None = Query(default=None, description="created_at < this"),
+    current_user=Depends(role_required(["doctor", "admin"])),
+    supabase: Client = Depends(get_supabase_admin),
+):
+    """List prescriptions sorted by date (newest first). Supports If-None-Match."""
+    filters = {
+        "status": status_filter,
+        "patient_id": patient_id,
+        "created_at_from": created_after,
+        "created_at_to": created_before,
+    }
+    try:
+        rows, total, next_cursor = await prescription_service.get_prescriptions(
+            supabase, limit, offset, cursor, count_mode=count, filters=filters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    etag = row_set_etag(rows, filters, limit, offset, cursor, total, next_cursor)
+    # Trusted DB rows: serialize straight to JSON, skipping response_model re-validation
+    return conditional_json(request, etag, lambda: {
+        "prescriptions": [_format_prescription(r) for r in rows],
+        "total": total,
+        "next_cursor": next_cursor,
+    })
+
+
+EXPORT_FIELDS = tuple(PrescriptionResponse.model_fields)
+
+
+@router.get("/export")
+async def export_prescriptions(
+    fmt: Literal["ndjson", "csv"] = Query(default="ndjson", alias="format"),
+    fields: str | None = Query(default=None, description="Comma-separated fields (default: all)"),
+    created_after: datetime | None = Query(default=None, description="created_at >= this"),
+    created_before: datetime | None = Query(default=None, description="created_at < this"),
+    status_filter: list[Literal["Pending", "Digitized", "Verified"]] | None = Query(default=None, alias="status"),
+    current_user=Depends(role_required(["doctor", "admin"])),
+    supabase: Client = Depends(get_supabase_admin),
+):
+    """Stream every matching prescription (oldest first) as NDJSON or CSV."""
+    selected = EXPORT_FIELDS
+    if fields:
+        selected = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in selected if f not in EXPORT_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(EXPORT_FIELDS)}",
+            )
+    # _format_prescription needs these regardless of the projection
+    columns = tuple(dict.fromkeys([*selected, "id", "patient_name", "date", "status"]))
+    rows = export.iter_rows(
+        supabase, "prescriptions", columns,
+        filters={"status": status_filter, "created_at_from": created_after, "created_at_to": created_before},
+    )
+
+    def format_row(row: dict) -> dict:
+        formatted = _format_prescription(row)
+        return {f: formatted[f] for f in selected}
+
+    filename = f"prescriptions-{datetime.now():%Y%m%d-%H%M%S}.{fmt}"
+    return StreamingResponse(
+        export.encode(rows, fmt, selected, format_row),
+        media_type=export.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/search", response_model=PrescriptionSearchResponse)
+async def search_prescriptions(
+    q: str = Query(..., min_length=2, max_length=200, description="Patient name, extracted name or drug"),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
     current_user=Depends(role_required(["doctor", "admin"])),
     supabase: Client = Depends(get_supabase_admin),
 ):
-    """List all prescriptions sorted by date (newest first)."""
-    rows, total = await prescription_service.get_prescriptions(supabase, limit, offset)
-    prescriptions = [_format_prescription(r) for r in rows]
-    return PrescriptionListResponse(prescriptions=prescriptions, total=total)
+    """Ranked search over patient/extracted names (fuzzy) and prescribed drugs."""
+    rows, has_more = await prescription_service.search_prescriptions(supabase, q.strip(), limit, offset)
+    return ORJSONResponse({
+        "prescriptions": [{**_format_prescription(r), "rank": r["rank"]} for r in rows],
+        "next_offset": offset + limit if has_more else None,
+    })
 
 
 @router.get("/{prescription_id}", response_model=PrescriptionResponse)
@@ -143,7 +239,28 @@ async def get_prescription(
     row = await prescription_service.get_prescription_by_id(supabase, prescription_id)
     if not row:
         raise HTTPException(status_code=404, detail="Prescription not found.")
-    return _format_prescription(row)
+    return ORJSONResponse(_format_prescription(row))
+
+
+@router.patch("/status", response_model=PrescriptionBulkStatusResponse)
+async def bulk_update_status(
+    body: PrescriptionBulkStatusUpdate,
+    current_user=Depends(role_required(["doctor", "admin"])),
+    supabase: Client = Depends(get_supabase_admin),
+):
+    """
+    Move many prescriptions to one status in a single UPDATE.
+    Missing ids and disallowed transitions are reported per id, not as errors.
+    """
+    rows, results = await prescription_service.bulk_update_prescription_status(
+        supabase, [str(i) for i in body.ids], body.status
+    )
+    return ORJSONResponse({
+        "status": body.status,
+        "updated": len(rows),
+        "results": results,
+        "prescriptions": [_format_prescription(r) for r in rows],
+    })
 
 
 @router.patch("/{prescription_id}/status", response_model=PrescriptionResponse)
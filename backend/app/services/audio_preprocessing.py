@@ -0,0 +1,279 @@
+"""
+Audio Preprocessing Service — Normalize recordings before transcription.
+Decodes whatever the browser recorded, downmixes to mono, resamples to 16 kHz,
+trims leading/trailing silence with an energy-based VAD and re-encodes compactly.
+Runs in a process pool so decoding and VAD never block the event loop.
+"""
+
+import asyncio
+import io
+import logging
+import shutil
+import subprocess
+import wave
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+FRAME_MS = 20
+PAD_MS = 200  # keep a little context around detected speech
+MIN_ENERGY = 300  # absolute RMS floor (int16) for "speech"
+NOISE_MULTIPLIER = 3.0  # speech threshold relative to the estimated noise floor
+OPUS_BITRATE = "24k"
+
+_FFMPEG = shutil.which("ffmpeg")
+
+
+def check_ffmpeg() -> bool:
+    """Startup check: without ffmpeg, browser recordings (WebM/Opus) go to Gemini un-normalized."""
+    if not _FFMPEG:
+        logger.warning(
+            "⚠️  ffmpeg not found on PATH — only WAV uploads will be normalized; "
+            "WebM/Opus, MP3 and OGG recordings are sent to Gemini unchanged"
+        )
+    return bool(_FFMPEG)
+
+
+# ── Decoding ──────────────────────────────────────────
+def _decode_ffmpeg(audio_bytes: bytes) -> array:
+    """Decode any container/codec ffmpeg understands to 16 kHz mono int16 PCM."""
+    proc = subprocess.run(
+        [_FFMPEG, "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+         "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE), "-f", "s16le", "pipe:1"],
+        input=audio_bytes,
+        capture_output=True,
+        check=True,
+    )
+    samples = array("h")
+    samples.frombytes(proc.stdout)
+    return samples
+
+
+def _decode_wav(audio_bytes: bytes) -> array:
+    """Pure-Python WAV fallback: downmix to mono and linearly resample to 16 kHz."""
+    with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError("Only 16-bit PCM WAV is supported without ffmpeg")
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        raw = array("h")
+        raw.frombytes(wav.readframes(wav.getnframes()))
+
+    if channels > 1:
+        mono = array("h", (
+            sum(raw[i:i + channels]) // channels for i in range(0, len(raw), channels)
+        ))
+    else:
+        mono = raw
+
+    if rate == TARGET_SAMPLE_RATE or not mono:
+        return mono
+
+    step = rate / TARGET_SAMPLE_RATE
+    out_len = int(len(mono) / step)
+    last = len(mono) - 1
+    resampled = array("h", bytes(2 * out_len))
+    for i in range(out_len):
+        pos = i * step
+        j = int(pos)
+        frac = pos - j
+        nxt = mono[j + 1] if j < last else mono[j]
+        resampled[i] = int(mono[j] + (nxt - mono[j]) * frac)
+    return resampled
+
+
+# ── Voice activity detection ──────────────────────────
+def _trim_silence(samples: array) -> array:
+    """Drop leading/trailing frames whose RMS energy is below the speech threshold."""
+    frame_len = TARGET_SAMPLE_RATE * FRAME_MS // 1000
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return samples
+
+    energies = []
+    for f in range(n_frames):
+        frame = samples[f * frame_len:(f + 1) * frame_len]
+        energies.append((sum(s * s for s in frame) / frame_len) ** 0.5)
+
+    noise_floor = sorted(energies)[n_frames // 10]
+    threshold = max(MIN_ENERGY, noise_floor * NOISE_MULTIPLIER)
+    voiced = [i for i, e in enumerate(energies) if e >= threshold]
+    if not voiced:
+        # Nothing clearly above the floor — keep everything rather than send empty audio
+        return samples
+
+    pad = PAD_MS // FRAME_MS
+    start = max(0, voiced[0] - pad) * frame_len
+    end = min(n_frames, voiced[-1] + 1 + pad) * frame_len
+    return samples[start:end]
+
+
+# ── Encoding ──────────────────────────────────────────
+def _encode(samples: array) -> tuple[bytes, str]:
+    """Encode 16 kHz mono PCM as Ogg/Opus when ffmpeg is available, else as WAV."""
+    pcm = samples.tobytes()
+    if _FFMPEG:
+        proc = subprocess.run(
+            [_FFMPEG, "-hide_banner", "-loglevel", "error",
+             "-f", "s16le", "-ar", str(TARGET_SAMPLE_RATE), "-ac", "1", "-i", "pipe:0",
+             "-c:a", "libopus", "-b:a", OPUS_BITRATE, "-application", "voip", "-f", "ogg", "pipe:1"],
+            input=pcm,
+            capture_output=True,
+            check=True,
+        )
+        return proc.stdout, "audio/ogg"
+
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(TARGET_SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return buf.getvalue(), "audio/wav"
+
+
+def normalize_audio_sync(audio_bytes: bytes, content_type: str) -> tuple[bytes, str]:
+    """
+    Decode → mono 16 kHz → trim silence → compact re-encode.
+    Returns (bytes, mime_type); falls back to the original input if it cannot be decoded.
+    """
+    mime = content_type.split(";")[0].strip()
+    try:
+        if _FFMPEG:
+            samples = _decode_ffmpeg(audio_bytes)
+        elif mime in ("audio/wav", "audio/x-wav"):
+            samples = _decode_wav(audio_bytes)
+        else:
+            return audio_bytes, mime
+
+        trimmed = _trim_silence(samples)
+        if not trimmed:
+            return audio_bytes, mime
+        return _encode(trimmed)
+    except Exception as e:
+        logger.warning(f"Audio normalization skipped ({mime}): {e}")
+        return audio_bytes, mime
+
+
+def encode_pcm_sync(pcm: bytes) -> tuple[bytes, str]:
+    """Encode raw 16 kHz mono int16 PCM (used for streamed segments)."""
+    samples = array("h")
+    samples.frombytes(pcm)
+    return _encode(samples)
+
+
+# ── Streaming segmentation ────────────────────────────
+class PauseSegmenter:
+    """
+    Incrementally splits a 16 kHz mono int16 PCM stream into utterances.
+    A segment is emitted once speech is followed by `pause_ms` of quiet,
+    or when it reaches `max_segment_ms`.
+    """
+
+    def __init__(self, pause_ms: int = 700, max_segment_ms: int = 15000):
+        self._frame_bytes = TARGET_SAMPLE_RATE * FRAME_MS // 1000 * 2
+        self._pause_frames = pause_ms // FRAME_MS
+        self._max_frames = max_segment_ms // FRAME_MS
+        self._pending = bytearray()  # bytes not yet forming a whole frame
+        self._segment = bytearray()
+        self._frames = 0
+        self._silent_run = 0
+        self._has_speech = False
+        self._noise_floor = float(MIN_ENERGY)
+
+    def feed(self, pcm: bytes) -> list[bytes]:
+        """Add PCM bytes; return any segments completed by this chunk."""
+        self._pending.extend(pcm)
+        completed = []
+        while len(self._pending) >= self._frame_bytes:
+            frame = bytes(self._pending[:self._frame_bytes])
+            del self._pending[:self._frame_bytes]
+            segment = self._push_frame(frame)
+            if segment:
+                completed.append(segment)
+        return completed
+
+    def flush(self) -> bytes | None:
+        """Return whatever speech is buffered at end of stream."""
+        self._segment.extend(self._pending)
+        self._pending.clear()
+        return self._cut() if self._has_speech else None
+
+    def _push_frame(self, frame: bytes) -> bytes | None:
+        samples = array("h")
+        samples.frombytes(frame)
+        energy = (sum(s * s for s in samples) / len(samples)) ** 0.5
+        voiced = energy >= max(MIN_ENERGY, self._noise_floor * NOISE_MULTIPLIER)
+
+        if voiced:
+            self._has_speech = True
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+            # Track background level slowly so a noisy room doesn't look like speech
+            self._noise_floor = 0.95 * self._noise_floor + 0.05 * energy
+
+        if not self._has_speech and not voiced:
+            # Leading silence: keep only a short pad before speech starts
+            self._segment.extend(frame)
+            max_pad = (PAD_MS // FRAME_MS) * self._frame_bytes
+            if len(self._segment) > max_pad:
+                del self._segment[:len(self._segment) - max_pad]
+            return None
+
+        self._segment.extend(frame)
+        self._frames += 1
+        if self._silent_run >= self._pause_frames or self._frames >= self._max_frames:
+            return self._cut()
+        return None
+
+    def _cut(self) -> bytes:
+        segment = bytes(self._segment)
+        self._segment.clear()
+        self._frames = 0
+        self._silent_run = 0
+        self._has_speech = False
+        return segment
+
+
+# ── Worker pool ───────────────────────────────────────
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_audio_pool() -> ProcessPoolExecutor:
+    """Lazily create the shared process pool for audio preprocessing."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=get_settings().AUDIO_WORKERS)
+    return _pool
+
+
+def shutdown_audio_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def normalize_audio(audio_bytes: bytes, content_type: str) -> tuple[bytes, str]:
+    """Run normalize_audio_sync in the worker pool and log the size reduction."""
+    loop = asyncio.get_running_loop()
+    data, mime = await loop.run_in_executor(
+        get_audio_pool(), normalize_audio_sync, audio_bytes, content_type
+    )
+    if len(audio_bytes):
+        logger.info(
+            f"🎚️  Audio normalized: {len(audio_bytes)} → {len(data)} bytes "
+            f"({len(data) / len(audio_bytes):.0%}, {mime})"
+        )
+    return data, mime
+
+
+async def encode_segment(pcm: bytes) -> tuple[bytes, str]:
+    """Encode a streamed PCM segment in the worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_audio_pool(), encode_pcm_sync, pcm)
@@ -2,27 +2,100 @@
 Dashboard Service — Aggregate statistics queries.
 """
 
+import asyncio
 import logging
+import time
 from datetime import date
 from supabase import Client
 
+from app.config import get_settings
+from app.services.db import execute
+
 logger = logging.getLogger(__name__)
 
 
+# ── Stats cache ───────────────────────────────────────
+# Every open dashboard polls /dashboard/stats; serve them all from one cached
+# result. Writes bump _version so the next read recomputes; a TTL-expired
+# entry is served stale while one background refresh runs.
+_cache: dict = {"value": None, "fetched_at": 0.0, "version": -1}
+_version = 0
+_inflight: asyncio.Task | None = None
+
+
+def invalidate_stats_cache() -> None:
+    """Mark cached stats out of date (called from patient/prescription write paths)."""
+    global _version
+    _version += 1
+
+
+def _refresh(supabase: Client) -> asyncio.Task:
+    """Start a stats recomputation unless one is already running (single-flight)."""
+    global _inflight
+    if _inflight is None or _inflight.done():
+        _inflight = asyncio.create_task(_recompute(supabase))
+    return _inflight
+
+
+async def _recompute(supabase: Client) -> dict:
+    version = _version  # writes landing mid-query leave the result marked stale
+    value = await get_dashboard_stats(supabase)
+    _cache.update(value=value, fetched_at=time.monotonic(), version=version)
+    return value
+
+
+async def get_cached_dashboard_stats(supabase: Client) -> dict:
+    """
+    Dashboard stats with a short TTL, write-driven invalidation,
+    stale-while-revalidate and single-flight refresh.
+    """
+    settings = get_settings()
+    value = _cache["value"]
+    age = time.monotonic() - _cache["fetched_at"]
+    current = _cache["version"] == _version
+
+    if value is not None and current:
+        if age < settings.DASHBOARD_STATS_TTL:
+            return value
+        if age < settings.DASHBOARD_STATS_STALE_TTL:
+            _refresh(supabase)  # revalidate in the background
+            return value
+
+    # Missing, invalidated by a write, or too old to serve: wait for the shared refresh
+    return await asyncio.shield(_refresh(supabase))
+
+
 async def get_dashboard_stats(supabase: Client) -> dict:
+    """
+    Compute aggregate dashboard statistics in one round trip via the
+    `get_dashboard_stats` SQL function (see supabase_migration.sql).
+    Falls back to the multi-query path if the function has not been deployed.
+    """
+    today = date.today().isoformat()
+    try:
+        result = await execute(supabase.rpc("get_dashboard_stats", {"p_today": today}))
+        if isinstance(result.data, dict):
+            return result.data
+    except Exception as e:
+        logger.warning(f"get_dashboard_stats RPC unavailable, using fallback queries: {e}")
+
+    return await _get_dashboard_stats_fallback(supabase, today)
+
+
+async def _get_dashboard_stats_fallback(supabase: Client, today: str) -> dict:
     """Compute aggregate dashboard statistics using optimized database counts and minimal data transfer."""
     try:
-        # Group 1: Efficient counts using PostgREST (no row data transferred)
-        total_res = supabase.table("patients").select("id", count="exact").limit(1).execute()
-        critical_res = supabase.table("patients").select("id", count="exact").eq("urgency_level", "Critical").limit(1).execute()
-        pending_res = supabase.table("prescriptions").select("id", count="exact").eq("status", "Pending").limit(1).execute()
-        
-        today = date.today().isoformat()
-        today_rx_res = supabase.table("prescriptions").select("id", count="exact").eq("date", today).limit(1).execute()
 
+        # All five queries are independent — issue them concurrently.
+        # Group 1: Efficient counts using PostgREST (no row data transferred)
         # Group 2: Fetch only necessary fields for complex aggregations
-        # This is still faster than fetching all columns (*)
-        calc_res = supabase.table("patients").select("wait_time, risk_scores").execute()
+        total_res, critical_res, pending_res, today_rx_res, calc_res = await asyncio.gather(
+            execute(supabase.table("patients").select("id", count="exact").limit(1)),
+            execute(supabase.table("patients").select("id", count="exact").eq("urgency_level", "Critical").limit(1)),
+            execute(supabase.table("prescriptions").select("id", count="exact").eq("status", "Pending").limit(1)),
+            execute(supabase.table("prescriptions").select("id", count="exact").eq("date", today).limit(1)),
+            execute(supabase.table("patients").select("wait_time, risk_scores")),
+        )
         patients_data = calc_res.data or []
         
         avg_wait = _compute_avg_wait(patients_data)
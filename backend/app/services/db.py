@@ -0,0 +1,45 @@
+"""
+DB Helpers — Run blocking Supabase calls off the event loop.
+The supabase-py sync client does blocking HTTP I/O in `.execute()`; these
+helpers hand that work to a dedicated thread pool so a single worker can
+serve many concurrent requests and independent queries can run in parallel.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from app.config import get_settings
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Lazily create the shared DB thread pool (sized to match the HTTP pool)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_settings().SUPABASE_POOL_MAX_CONNECTIONS,
+            thread_name_prefix="supabase",
+        )
+    return _executor
+
+
+def shutdown_db_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_sync(func, *args, **kwargs):
+    """Run any blocking callable (storage upload, auth call, …) in the DB pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_db_executor(), functools.partial(func, *args, **kwargs)
+    )
+
+
+async def execute(query):
+    """Await a PostgREST query builder without blocking the event loop."""
+    return await run_sync(query.execute)
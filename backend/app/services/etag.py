@@ -0,0 +1,52 @@
+"""
+ETag Helpers — Conditional GET for polled endpoints.
+Tags are strong validators derived from what identifies a response's
+content: the (id, updated_at) of every row on a page plus the query that
+selected them, or a hash of the payload for small aggregates. A matching
+If-None-Match gets a bodyless 304 before any formatting/serialization.
+"""
+
+import hashlib
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+# Clients may keep the body but must revalidate before reusing it
+CACHE_CONTROL = "private, no-cache"
+
+
+def _digest(data: bytes) -> str:
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+def row_set_etag(rows: list[dict], *query) -> str:
+    """Tag for a page of rows: every row's id + updated_at, and the query params/totals."""
+    return _digest(orjson.dumps(
+        [query, [(r.get("id"), r.get("updated_at")) for r in rows]],
+        default=str,
+    ))
+
+
+def content_etag(content) -> str:
+    """Tag for a small payload hashed in full (e.g. dashboard stats)."""
+    return _digest(orjson.dumps(content, default=str, option=orjson.OPT_SORT_KEYS))
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match already names this tag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return any(t.strip().removeprefix("W/") == etag for t in header.split(","))
+
+
+def conditional_json(request: Request, etag: str, build) -> Response:
+    """304 if the client's copy is current, else ORJSONResponse(build()) carrying the tag."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(build(), headers=headers)
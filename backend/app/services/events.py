@@ -0,0 +1,116 @@
+"""
+Change Events — In-process fan-out of patient/prescription writes.
+Service write paths publish compact events ({table, op, row_id, fields});
+every connected client (see routers/events.py) gets them from its own
+bounded queue. Recent events are kept in a ring buffer so a reconnecting
+client can resume from its Last-Event-ID.
+
+Event ids are "<boot id>-<sequence>": the sequence restarts with the process,
+so an id from another boot (a restart, or another worker) is never read as a
+position in this buffer — the client gets a `reset` instead.
+
+Events only cover writes made by this process; with several workers each
+worker's clients see that worker's writes.
+"""
+
+import asyncio
+import itertools
+import logging
+import secrets
+from collections import deque
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """One connected client: a bounded queue, dropped if it falls behind."""
+
+    def __init__(self, tables: set[str] | None, maxsize: int):
+        self.tables = tables
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def wants(self, event: dict) -> bool:
+        return self.tables is None or event["table"] in self.tables
+
+
+class EventHub:
+    def __init__(self, buffer_size: int, client_queue_size: int):
+        self.boot_id = secrets.token_hex(4)
+        self._seqs = itertools.count(1)
+        self._last_seq = 0
+        # (sequence, event) pairs, oldest first
+        self._buffer: deque[tuple[int, dict]] = deque(maxlen=buffer_size)
+        self._subscribers: set[Subscriber] = set()
+        self._client_queue_size = client_queue_size
+
+    @property
+    def last_id(self) -> str:
+        return f"{self.boot_id}-{self._last_seq}"
+
+    def _parse_id(self, event_id: str) -> int | None:
+        """Sequence number of an id issued by this process, else None."""
+        boot_id, _, seq = event_id.rpartition("-")
+        return int(seq) if boot_id == self.boot_id and seq.isdigit() else None
+
+    def publish(self, table: str, op: str, row_id, fields: dict | None = None) -> dict:
+        """Record a change and push it to every subscriber without blocking the writer."""
+        self._last_seq = next(self._seqs)
+        event = {
+            "id": f"{self.boot_id}-{self._last_seq}", "table": table, "op": op,
+            "row_id": str(row_id), "fields": fields or {},
+        }
+        self._buffer.append((self._last_seq, event))
+        for sub in list(self._subscribers):
+            if not sub.wants(event):
+                continue
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow client: disconnect it; it resumes from Last-Event-ID on reconnect
+                sub.overflowed = True
+                self._subscribers.discard(sub)
+                logger.warning("⚠️  Change-event client fell behind; dropping it.")
+        return event
+
+    def subscribe(self, tables: set[str] | None = None, last_event_id: str | None = None) -> tuple[Subscriber, list[dict] | None]:
+        """
+        Register a client. Returns (subscriber, backlog): the buffered events after
+        `last_event_id`, or None if that id has left the buffer or was issued by
+        another boot/worker (client must refetch).
+        """
+        sub = Subscriber(tables, self._client_queue_size)
+        backlog: list[dict] | None = []
+        if last_event_id is not None:
+            seq = self._parse_id(last_event_id)
+            if seq is None or seq > self._last_seq:
+                backlog = None  # another process's id: its sequence means nothing here
+            elif seq < self._last_seq:
+                # Events between seq and the oldest buffered one were evicted: can't replay
+                if not self._buffer or seq < self._buffer[0][0] - 1:
+                    backlog = None
+                else:
+                    backlog = [e for s, e in self._buffer if s > seq and sub.wants(e)]
+        self._subscribers.add(sub)
+        return sub, backlog
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subscribers.discard(sub)
+
+
+_hub: EventHub | None = None
+
+
+def get_event_hub() -> EventHub:
+    global _hub
+    if _hub is None:
+        settings = get_settings()
+        _hub = EventHub(settings.EVENTS_BUFFER_SIZE, settings.EVENTS_CLIENT_QUEUE_SIZE)
+    return _hub
+
+
+def publish_change(table: str, op: str, row_id, fields: dict | None = None) -> None:
+    """Publish a change event from a service write path (insert | update | delete)."""
+    get_event_hub().publish(table, op, row_id, fields)
@@ -0,0 +1,202 @@
+"""
+Formulary Service — Local drug-name normalization.
+Maps free-text drug names coming out of OCR (misspellings, brand names,
+odd casing, strengths) to a canonical formulary ID without any model calls.
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FORMULARY_PATH = Path(__file__).resolve().parent.parent / "data" / "formulary.json"
+
+# Matches below this confidence are treated as unknown drugs. Many drugs
+# differ from a look-alike by two or three letters (Prednisone/Prednisolone,
+# Citalopram/Escitalopram), so fuzzy matching only forgives small OCR slips:
+# at most one edit (two for names of 14+ characters), the leading characters
+# must agree, and a name close to more than one drug is left unmatched.
+MIN_CONFIDENCE = 0.85
+LONG_NAME = 14
+LEADING_CHARS = 3
+
+# Dosage-form words that OCR often keeps in front of / behind the drug name
+_FORM_WORDS = {
+    "tab", "tabs", "tablet", "tablets", "cap", "caps", "capsule", "capsules",
+    "syp", "syr", "syrup", "susp", "suspension", "inj", "injection", "drops",
+    "drop", "cream", "oint", "ointment", "gel", "inhaler", "sachet", "sachets",
+    "soln", "solution", "spray", "lotion", "sr", "xr", "er", "cr", "mr", "ds",
+}
+_DOSE_RE = re.compile(r"\b\d+(?:\.\d+)?\s*(?:mg|mcg|ug|g|gm|ml|iu|units?|%)?\b")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_drug_name(raw: str) -> str:
+    """Lowercase, drop punctuation, strengths and dosage-form words."""
+    text = _NON_ALNUM_RE.sub(" ", (raw or "").lower())
+    text = _DOSE_RE.sub(" ", text)
+    tokens = [t for t in text.split() if t not in _FORM_WORDS]
+    return " ".join(tokens)
+
+
+def _levenshtein(a: str, b: str, limit: int) -> int:
+    """Edit distance between a and b, bailing out early once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            )
+            current.append(cost)
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _trigrams(term: str) -> set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrigramIndex:
+    """Inverted trigram index used to shortlist candidates before computing edit distance."""
+
+    def __init__(self):
+        self._terms: list[str] = []
+        self._sizes: list[int] = []
+        self._postings: dict[str, list[int]] = {}
+
+    def add(self, term: str) -> None:
+        term_id = len(self._terms)
+        grams = _trigrams(term)
+        self._terms.append(term)
+        self._sizes.append(len(grams))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(term_id)
+
+    def candidates(self, query: str, limit: int = 5) -> list[str]:
+        """Return up to `limit` terms with the highest trigram (Dice) similarity to query."""
+        grams = _trigrams(query)
+        shared: dict[int, int] = {}
+        for gram in grams:
+            for term_id in self._postings.get(gram, ()):
+                shared[term_id] = shared.get(term_id, 0) + 1
+        ranked = sorted(
+            shared.items(),
+            key=lambda item: 2 * item[1] / (len(grams) + self._sizes[item[0]]),
+            reverse=True,
+        )
+        return [self._terms[term_id] for term_id, _ in ranked[:limit]]
+
+
+class FormularyIndex:
+    """Exact alias map plus a trigram index for fuzzy matching of drug names."""
+
+    def __init__(self, entries: list[dict]):
+        self._entries: dict[str, dict] = {}
+        self._by_name: dict[str, str] = {}  # normalized name/alias -> canonical id
+        self._trigrams = _TrigramIndex()
+
+        for entry in entries:
+            canonical_id = entry["id"]
+            self._entries[canonical_id] = entry
+            for name in [entry["generic"], *entry.get("aliases", [])]:
+                key = normalize_drug_name(name)
+                if key and key not in self._by_name:
+                    self._by_name[key] = canonical_id
+                    self._trigrams.add(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def match(self, raw_name: str) -> dict | None:
+        """
+        Map a raw drug string to {canonical_id, generic_name, match_confidence}.
+        Returns None when nothing in the formulary is close enough.
+        """
+        query = normalize_drug_name(raw_name)
+        if not query:
+            return None
+
+        best = self._match_term(query)
+        # Brand names usually lead ("Panadol Extra", "Augmentin Duo")
+        if best is None and " " in query:
+            first = self._match_term(query.split(" ", 1)[0])
+            if first is not None:
+                best = (first[0], first[1] * 0.9)
+
+        if best is None or best[1] < MIN_CONFIDENCE:
+            return None
+
+        canonical_id, confidence = best
+        return {
+            "canonical_id": canonical_id,
+            "generic_name": self._entries[canonical_id]["generic"],
+            "match_confidence": round(confidence, 2),
+        }
+
+    def _match_term(self, query: str) -> tuple[str, float] | None:
+        canonical_id = self._by_name.get(query)
+        if canonical_id:
+            return canonical_id, 1.0
+        if len(query) < 4:
+            return None
+
+        radius = 2 if len(query) >= LONG_NAME else 1
+        close: dict[str, tuple[int, str]] = {}  # canonical id -> (distance, term)
+        for term in self._trigrams.candidates(query):
+            if term[:LEADING_CHARS] != query[:LEADING_CHARS]:
+                continue
+            d = _levenshtein(query, term, limit=radius)
+            if d <= radius:
+                term_id = self._by_name[term]
+                if term_id not in close or d < close[term_id][0]:
+                    close[term_id] = (d, term)
+        if len(close) != 1:
+            if close:
+                logger.info(f"Formulary: '{query}' is ambiguous between {sorted(close)}; left unmatched")
+            return None
+        canonical_id, (distance, term) = next(iter(close.items()))
+        confidence = 1.0 - distance / max(len(query), len(term))
+        return canonical_id, confidence
+
+
+# ── Singleton ─────────────────────────────────────────
+_index: FormularyIndex | None = None
+
+
+def load_formulary(path: str | Path | None = None) -> FormularyIndex:
+    """Load the formulary JSON and build the in-memory index (called at startup)."""
+    global _index
+    source = Path(path) if path else DEFAULT_FORMULARY_PATH
+    try:
+        with open(source, encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Failed to load formulary from {source}: {e}")
+        entries = []
+    _index = FormularyIndex(entries)
+    logger.info(f"💊 Formulary loaded: {len(_index)} drugs from {source.name}")
+    return _index
+
+
+def get_formulary() -> FormularyIndex:
+    """Return the loaded formulary index, loading the bundled one on first use."""
+    if _index is None:
+        return load_formulary(get_settings().FORMULARY_PATH or None)
+    return _index
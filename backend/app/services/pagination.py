@@ -0,0 +1,98 @@
+"""
+Pagination Helpers — Keyset cursors and count strategy for list endpoints.
+A cursor is the sort key of the last row on a page, base64url-encoded so
+clients treat it as an opaque token and pass it back as ?cursor=.
+Typed filters are pushed into the query; totals are computed per the
+requested count mode and cached briefly per table + filter set.
+"""
+
+import base64
+import json
+import time
+
+
+def encode_cursor(row: dict, keys: tuple[str, ...]) -> str:
+    """Encode the sort-key values of `row` into an opaque cursor string."""
+    values = [row.get(k) for k in keys]
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: tuple[str, ...]) -> dict:
+    """Decode a cursor back into {key: value}. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor.") from e
+    if not isinstance(values, list) or len(values) != len(keys) or any(v is None for v in values):
+        raise ValueError("Invalid cursor.")
+    return dict(zip(keys, values))
+
+
+def quote(value) -> str:
+    """Quote a value for use inside a PostgREST or=(...) filter."""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+# ── Filters ───────────────────────────────────────────
+# Typed list filters arrive as {name: value}; list values become IN (...),
+# *_from / *_to become half-open ranges on the named column.
+def _filter_value(value) -> str:
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def apply_filters(query, filters: dict | None):
+    """Push list filters down into a PostgREST query builder."""
+    for name, value in (filters or {}).items():
+        if value is None or value == []:
+            continue
+        if name.endswith("_from"):
+            query = query.gte(name.removesuffix("_from"), _filter_value(value))
+        elif name.endswith("_to"):
+            query = query.lt(name.removesuffix("_to"), _filter_value(value))
+        elif isinstance(value, (list, tuple)):
+            query = query.in_(name, [_filter_value(v) for v in value])
+        else:
+            query = query.eq(name, _filter_value(value))
+    return query
+
+
+def count_key(table: str, filters: dict | None) -> str:
+    """Count-cache key for a (possibly filtered) listing, e.g. "patients:status=Pending"."""
+    parts = [
+        f"{k}={','.join(map(_filter_value, v)) if isinstance(v, (list, tuple)) else _filter_value(v)}"
+        for k, v in sorted((filters or {}).items())
+        if v is not None and v != []
+    ]
+    return f"{table}:{'&'.join(parts)}" if parts else table
+
+
+# ── Count strategy ────────────────────────────────────
+# exact     — COUNT(*) (precise, scans the table)
+# planned   — the query planner's row estimate (cheap, approximate)
+# estimated — exact below PostgREST's max-rows threshold, planned above it
+# none      — skip counting; total is returned as null
+COUNT_MODES = ("exact", "planned", "estimated", "none")
+COUNT_CACHE_TTL = 10.0  # seconds
+
+_count_cache: dict[tuple[str, str], tuple[int, float]] = {}
+
+
+def cached_count(key: str, mode: str) -> int | None:
+    """Return a recently computed total for this list/mode, if still fresh."""
+    entry = _count_cache.get((key, mode))
+    if entry and entry[1] > time.monotonic():
+        return entry[0]
+    return None
+
+
+def remember_count(key: str, mode: str, total: int | None) -> None:
+    if total is not None and mode != "none":
+        _count_cache[(key, mode)] = (total, time.monotonic() + COUNT_CACHE_TTL)
+
+
+def invalidate_counts(table: str) -> None:
+    """Drop cached totals for a table (called from its write paths)."""
+    for cache_key in [k for k in _count_cache if k[0].split(":", 1)[0] == table]:
+        _count_cache.pop(cache_key, None)
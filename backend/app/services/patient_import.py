@@ -0,0 +1,241 @@
+"""
+Patient Import — Bulk load historical patients from CSV / NDJSON.
+The upload is read incrementally (Starlette spools it to disk), validated
+row by row with PatientImportRow, and written in multi-row INSERT batches,
+so memory stays bounded by the batch size whatever the file size.
+
+Triage modes:
+  skip   — store as-is (urgency from the file's urgency_score, else Medium); the default
+  defer  — store now, flag triage_pending, prioritize in the background
+  inline — run the prioritization agent for each row before inserting
+
+defer and inline make one model call per row. A failed call never stores the
+agent's Medium fallback as a result: the row stays triage_pending for a later pass.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Iterator
+
+from pydantic import ValidationError
+from supabase import Client
+from google.generativeai import GenerativeModel
+
+from app.config import get_settings
+from app.models.patient import PatientImportRow
+from app.services import patient_service
+from app.services.db import run_sync
+from app.agents.prioritization import assess_patient_priority, _score_to_level, _score_to_wait
+
+logger = logging.getLogger(__name__)
+
+TRIAGE_MODES = ("skip", "defer", "inline")
+DEFAULT_URGENCY_SCORE = 50
+MAX_ERRORS_PER_BATCH = 20
+
+
+class ImportFormatError(ValueError):
+    """The upload itself is unreadable (encoding, CSV structure) — a client error."""
+
+
+# ── Parsing ───────────────────────────────────────────
+def _csv_rows(stream) -> Iterator[dict | Exception]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    for record in csv.DictReader(text):
+        if None in record:
+            yield ValueError(f"Row has {len(record[None])} more field(s) than the header.")
+            continue
+        # Blank cells mean "not provided"; history is ';'-separated
+        row = {k.strip(): v.strip() for k, v in record.items() if k and v and v.strip()}
+        if "history" in row:
+            row["history"] = [h.strip() for h in row["history"].split(";") if h.strip()]
+        yield row
+
+
+def _ndjson_rows(stream) -> Iterator[dict | Exception]:
+    for line in io.TextIOWrapper(stream, encoding="utf-8"):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            yield row if isinstance(row, dict) else ValueError("Each line must be a JSON object.")
+        except json.JSONDecodeError as e:
+            yield ValueError(f"Invalid JSON: {e.msg}")
+
+
+def detect_format(filename: str | None, content_type: str | None) -> str | None:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    if name.endswith(".csv") or content_type in ("text/csv", "application/vnd.ms-excel"):
+        return "csv"
+    return None
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+# ── Row → patient data ────────────────────────────────
+def _to_patient_data(row: PatientImportRow, priority: dict | None, pending: bool) -> dict:
+    history = row.history
+    if not history and row.medical_history:
+        history = [h.strip() for h in row.medical_history.split(",") if h.strip()]
+    if priority is None:
+        score = row.urgency_score if row.urgency_score is not None else DEFAULT_URGENCY_SCORE
+        priority = {"urgency_score": score, "urgency_level": _score_to_level(score), "wait_time": _score_to_wait(score)}
+    created_at = row.created_at or datetime.now(timezone.utc)
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return {
+        "name": row.name,
+        "age": row.age,
+        "gender": row.gender,
+        "symptoms": row.symptoms,
+        "history": history,
+        "avatar": patient_service.make_avatar(row.name),
+        "urgency_score": priority["urgency_score"],
+        "urgency_level": priority["urgency_level"],
+        "wait_time": priority["wait_time"],
+        "created_at": created_at.isoformat(),
+        "triage_pending": pending,
+    }
+
+
+async def _prioritize(rows: list[PatientImportRow], gemini: GenerativeModel) -> list[dict | None]:
+    """Agent results per row; None where the call failed (the row is stored triage_pending)."""
+    semaphore = asyncio.Semaphore(get_settings().IMPORT_TRIAGE_CONCURRENCY)
+
+    async def one(row: PatientImportRow) -> dict | None:
+        async with semaphore:
+            try:
+                return await assess_patient_priority(
+                    model=gemini, name=row.name, age=row.age, gender=row.gender,
+                    symptoms=row.symptoms, history=row.history, raise_on_error=True,
+                )
+            except Exception:
+                return None
+
+    return await asyncio.gather(*(one(r) for r in rows))
+
+
+# ── Import ────────────────────────────────────────────
+async def import_patients(
+    supabase: Client,
+    stream,
+    fmt: str,
+    triage: str,
+    batch_size: int,
+    user_id: str,
+    gemini: GenerativeModel | None = None,
+) -> dict:
+    """Stream rows from `stream` into the patients table; returns the import report."""
+    rows = _csv_rows(stream) if fmt == "csv" else _ndjson_rows(stream)
+    report = {
+        "format": fmt, "triage": triage, "total_rows": 0, "inserted": 0, "failed": 0, "triage_pending": 0,
+        "batches": [],
+    }
+    row_number = 0
+
+    while True:
+        # File reads + parsing happen off the event loop, one batch at a time
+        try:
+            raw = await run_sync(lambda: list(islice(rows, batch_size)))
+        except UnicodeDecodeError:
+            raise ImportFormatError("File must be UTF-8 encoded.")
+        except (csv.Error, ValueError) as e:
+            raise ImportFormatError(f"Malformed {fmt.upper()}: {e}")
+        if not raw:
+            break
+        first_row = row_number + 1
+        errors: list[tuple[int, str]] = []
+        valid: list[tuple[int, PatientImportRow]] = []
+        for item in raw:
+            row_number += 1
+            if isinstance(item, Exception):
+                errors.append((row_number, str(item)))
+                continue
+            try:
+                valid.append((row_number, PatientImportRow.model_validate(item)))
+            except ValidationError as e:
+                errors.append((row_number, _validation_message(e)))
+
+        inserted = 0
+        if valid:
+            priorities = (
+                await _prioritize([r for _, r in valid], gemini) if triage == "inline" else [None] * len(valid)
+            )
+            patients = [
+                _to_patient_data(r, p, pending=(triage == "defer" or (triage == "inline" and p is None)))
+                for (_, r), p in zip(valid, priorities)
+            ]
+            stored, insert_errors = await patient_service.bulk_create_patients(supabase, patients, user_id)
+            inserted = len(stored)
+            report["triage_pending"] += sum(1 for row in stored if row.get("triage_pending"))
+            errors.extend((valid[i][0], msg) for i, msg in insert_errors)
+
+        errors.sort()
+        report["batches"].append({
+            "batch": len(report["batches"]) + 1,
+            "first_row": first_row,
+            "last_row": row_number,
+            "inserted": inserted,
+            "failed": len(errors),
+            "errors": [{"row": n, "error": msg} for n, msg in errors[:MAX_ERRORS_PER_BATCH]],
+        })
+        report["inserted"] += inserted
+        report["failed"] += len(errors)
+        logger.info(f"📥 Import batch {len(report['batches'])}: rows {first_row}-{row_number}, "
+                    f"{inserted} inserted, {len(errors)} failed")
+
+    report["total_rows"] = row_number
+    return report
+
+
+# ── Deferred triage ───────────────────────────────────
+_deferred_task: asyncio.Task | None = None
+
+
+async def _run_deferred_triage(supabase: Client, gemini: GenerativeModel) -> None:
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(settings.IMPORT_TRIAGE_CONCURRENCY)
+    failed: set[str] = set()
+
+    async def one(row: dict) -> None:
+        async with semaphore:
+            try:
+                priority = await assess_patient_priority(
+                    model=gemini, name=row["name"], age=row["age"], gender=row["gender"],
+                    symptoms=row["symptoms"], history=row.get("history") or [], raise_on_error=True,
+                )
+                await patient_service.update_patient_priority(supabase, row["id"], priority)
+            except Exception as e:
+                logger.warning(f"⚠️  Deferred triage failed for {row['id']}: {e}")
+                failed.add(row["id"])
+
+    while True:
+        pending = [
+            r for r in await patient_service.get_triage_pending(supabase, limit=50 + len(failed))
+            if r["id"] not in failed
+        ][:50]
+        if not pending:
+            break
+        failed_before = len(failed)
+        await asyncio.gather(*(one(r) for r in pending))
+        if len(failed) - failed_before == len(pending):
+            # Nothing got through (quota, outage): stop instead of burning through every row
+            logger.warning("⚠️  Deferred triage: whole batch failed, pausing until the next import")
+            break
+    logger.info(f"🩺 Deferred triage pass finished ({len(failed)} failed, left pending)")
+
+
+def start_deferred_triage(supabase: Client, gemini: GenerativeModel) -> None:
+    """Start the background prioritization pass unless one is already running."""
+    global _deferred_task
+    if _deferred_task is None or _deferred_task.done():
+        _deferred_task = asyncio.create_task(_run_deferred_triage(supabase, gemini))
@@ -3,11 +3,26 @@ Patient Service — CRUD operations via Supabase.
 """
 
 import logging
-import json
 import asyncio
 import httpx
 from supabase import Client
 
+from app.services.db import execute
+from app.services.pagination import (
+    encode_cursor,
+    decode_cursor,
+    quote,
+    apply_filters,
+    count_key,
+    cached_count,
+    remember_count,
+    invalidate_counts,
+)
+from app.services.dashboard_service import invalidate_stats_cache
+from app.services.events import publish_change
+from app.services.triage_queue import get_triage_queue
+from app.services.prescription_service import PRESCRIPTION_COLUMNS, PRESCRIPTION_CURSOR_KEYS
+
 logger = logging.getLogger(__name__)
 
 def retry_db_operation(max_retries: int = 2, delay: float = 1.0):
@@ -42,14 +57,54 @@ def _table_missing(e: Exception) -> bool:
     return "pgrst205" in error_str or "could not find the table" in error_str
 
 
-@retry_db_operation(max_retries=2, delay=1.0)
-async def create_patient(supabase: Client, patient_data: dict, user_id: str = None) -> dict:
-    """Insert a new patient record and return the created row."""
-    # Serialize AI summary dict to JSON string for storage in TEXT column
-    ai_summary = patient_data.get("ai_summary", "")
-    if isinstance(ai_summary, dict):
-        ai_summary = json.dumps(ai_summary)
+# Threshold shared with the dashboard's risk_alerts count
+HIGH_RISK_THRESHOLD = 70
+
+
+def wait_time_to_minutes(wait_time: str) -> int | None:
+    """Parse agent wait_time text ("Immediate", "5 min") into minutes."""
+    if wait_time == "Immediate":
+        return 0
+    if "min" in (wait_time or ""):
+        digits = "".join(c for c in wait_time if c.isdigit())
+        return int(digits) if digits else None
+    return None
+
+
+def max_risk_score(risk_scores: list[dict]) -> int:
+    """Highest condition score from the risk analyzer output (0 if none)."""
+    scores = [
+        int(rs.get("score", 0)) for rs in risk_scores or []
+        if isinstance(rs, dict) and isinstance(rs.get("score", 0), (int, float))
+    ]
+    return max(scores, default=0)
+
+
+# Fields carried by insert/update events — what the doctor dashboard renders,
+# so live clients can apply a change without fetching the patient
+EVENT_FIELDS = (
+    "name", "age", "gender", "symptoms", "avatar", "urgency_score", "urgency_level", "wait_time", "wait_minutes",
+    "high_risk", "risk_scores", "ai_summary", "created_at",
+)
 
+
+def _on_insert(row: dict) -> None:
+    """Sync in-process views of the queue with a newly stored patient."""
+    if row:
+        get_triage_queue().add(row)
+        publish_change("patients", "insert", row["id"], {f: row.get(f) for f in EVENT_FIELDS if f in row})
+
+
+def make_avatar(name: str) -> str:
+    """Generate initials from a name, e.g. 'Ahmed Khan' → 'AK'."""
+    parts = name.strip().split()
+    if len(parts) >= 2:
+        return (parts[0][0] + parts[-1][0]).upper()
+    return name[:2].upper() if name else "??"
+
+
+def _build_payload(patient_data: dict, user_id: str = None) -> dict:
+    """Map triaged patient data to a patients row."""
     payload = {
         "name": patient_data["name"],
         "age": patient_data["age"],
@@ -61,67 +116,311 @@ async def create_patient(supabase: Client, patient_data: dict, user_id: str = No
         "avatar": patient_data.get("avatar", ""),
         "history": patient_data.get("history", []),
         "risk_scores": patient_data.get("risk_scores", []),
-        "ai_summary": ai_summary,
+        "ai_summary": patient_data.get("ai_summary"),  # JSONB column, stored as-is
+        # Precomputed so dashboards/filters can aggregate in SQL
+        "wait_minutes": wait_time_to_minutes(patient_data["wait_time"]),
+        "max_risk_score": max_risk_score(patient_data.get("risk_scores", [])),
     }
+    payload["high_risk"] = payload["max_risk_score"] >= HIGH_RISK_THRESHOLD
     if user_id:
         payload["created_by"] = user_id
+    return payload
 
+
+@retry_db_operation(max_retries=2, delay=1.0)
+async def create_patient(supabase: Client, patient_data: dict, user_id: str = None) -> dict:
+    """Insert a new patient record and return the created row."""
+    payload = _build_payload(patient_data, user_id)
     try:
-        result = supabase.table("patients").insert(payload).execute()
-        return result.data[0] if result.data else {}
+        result = await execute(supabase.table("patients").insert(payload))
+        invalidate_stats_cache()
+        invalidate_counts("patients")
+        row = result.data[0] if result.data else {}
+        _on_insert(row)
+        return row
     except Exception as e:
         if _table_missing(e):
             logger.warning("patients table does not exist yet. Run the SQL migration.")
             raise ValueError("Database table 'patients' not found. Please run the SQL migration in Supabase.")
+        # No missing-column fallback: every read selects the migrated columns,
+        # so an unmigrated database fails there anyway — run the migration.
         raise
 
 
+@retry_db_operation(max_retries=2, delay=1.0)
+async def bulk_create_patients(
+    supabase: Client, patients: list[dict], user_id: str = None
+) -> tuple[list[dict], list[tuple[int, str]]]:
+    """
+    Insert many patients with one multi-row INSERT. If the batch is rejected,
+    rows are retried one by one so a single bad row doesn't sink the rest.
+    Each item also carries created_at (ISO string) and triage_pending — PostgREST
+    needs the same keys on every row of a multi-row insert.
+    Rows are flagged `imported` and stay out of the live triage queue.
+    Returns (inserted rows, [(index in `patients`, error)]).
+    """
+    payloads = [
+        {
+            **_build_payload(p, user_id),
+            "created_at": p["created_at"],
+            "triage_pending": p.get("triage_pending", False),
+            "imported": True,
+        }
+        for p in patients
+    ]
+    try:
+        result = await execute(supabase.table("patients").insert(payloads))
+        inserted, errors = result.data or [], []
+    except Exception as e:
+        if _table_missing(e):
+            raise ValueError("Database table 'patients' not found. Please run the SQL migration in Supabase.")
+        logger.warning(f"⚠️  Batch insert rejected ({e}); retrying {len(payloads)} rows individually")
+        inserted, errors = [], []
+        for i, payload in enumerate(payloads):
+            try:
+                result = await execute(supabase.table("patients").insert(payload))
+                inserted.extend(result.data or [])
+            except Exception as row_error:
+                errors.append((i, str(row_error)))
+
+    if inserted:
+        invalidate_stats_cache()
+        invalidate_counts("patients")
+    return inserted, errors
+
+
+@retry_db_operation(max_retries=2, delay=1.0)
+async def get_triage_pending(supabase: Client, limit: int = 50) -> list[dict]:
+    """Patients imported with deferred triage that still need prioritization."""
+    result = await execute(
+        supabase.table("patients")
+        .select("id,name,age,gender,symptoms,history")
+        .eq("triage_pending", True)
+        .order("created_at")
+        .limit(limit)
+    )
+    return result.data or []
+
+
+@retry_db_operation(max_retries=2, delay=1.0)
+async def update_patient_priority(supabase: Client, patient_id: str, priority: dict) -> dict | None:
+    """Store a prioritization result on an imported patient and clear triage_pending."""
+    result = await execute(
+        supabase.table("patients")
+        .update({
+            "urgency_score": priority["urgency_score"],
+            "urgency_level": priority["urgency_level"],
+            "wait_time": priority["wait_time"],
+            "wait_minutes": wait_time_to_minutes(priority["wait_time"]),
+            "triage_pending": False,
+        })
+        .eq("id", patient_id)
+    )
+    row = result.data[0] if result.data else None
+    if row:
+        invalidate_stats_cache()
+        invalidate_counts("patients")  # urgency_level changed: level-filtered totals are stale
+        publish_change("patients", "update", patient_id, {f: row.get(f) for f in EVENT_FIELDS if f in row})
+    return row
+
+
+# Every column the API reads (not "*": the search_vector column is never sent back)
+PATIENT_COLUMNS = (
+    "id,name,age,gender,symptoms,urgency_score,urgency_level,wait_time,avatar,history,"
+    "risk_scores,ai_summary,wait_minutes,max_risk_score,high_risk,"
+    "created_by,created_at,updated_at"
+)
+
+# Triage order: most urgent first, then first-come-first-served, id as tiebreaker.
+# Static so it can be indexed; the wait-aware order lives in the triage queue.
+PATIENT_CURSOR_KEYS = ("urgency_score", "created_at", "id")
+
+
+def _after_patient_cursor(query, cursor: dict):
+    """
+    Keyset filter: rows strictly after the cursor in triage order.
+    The redundant AND bound lets Postgres start the index scan at the cursor;
+    the OR alone is only a filter over every row before it.
+    """
+    score, created_at, row_id = cursor["urgency_score"], quote(cursor["created_at"]), quote(cursor["id"])
+    return query.lte("urgency_score", int(score)).or_(
+        f"urgency_score.lt.{int(score)},"
+        f"and(urgency_score.eq.{int(score)},created_at.gt.{created_at}),"
+        f"and(urgency_score.eq.{int(score)},created_at.eq.{created_at},id.gt.{row_id})"
+    )
+
+
 @retry_db_operation(max_retries=2, delay=1.0)
 async def get_patients(
-    supabase: Client, limit: int = 50, offset: int = 0
-) -> tuple[list[dict], int]:
-    """Fetch patients sorted by urgency (highest first). Returns (rows, total_count)."""
+    supabase: Client,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: str | None = None,
+    count_mode: str = "exact",
+    columns: tuple[str, ...] | None = None,
+    filters: dict | None = None,
+) -> tuple[list[dict], int | None, str | None]:
+    """
+    Fetch patients in triage order (most urgent first, then oldest).
+    Pages by keyset when `cursor` is given, otherwise by offset.
+    `filters` (urgency_level, created_at_from/_to, created_by) run in the database.
+    `columns` limits the projection (sort keys and updated_at are always included
+    for the cursor and ETag).
+    Returns (rows, total_count, next_cursor); total is None for count_mode="none".
+    """
+    select = ",".join(dict.fromkeys([*columns, *PATIENT_CURSOR_KEYS, "updated_at"])) if columns else PATIENT_COLUMNS
+    after = decode_cursor(cursor, PATIENT_CURSOR_KEYS) if cursor else None
+    cache_key = count_key("patients", filters)
+    total = cached_count(cache_key, count_mode)
+    needs_count = count_mode != "none" and total is None
+    # Offset pages count in the same request; keyset pages are filtered, so they can't
+    inline_count = needs_count and not after
     try:
-        # Fetch data and count in a single request
-        result = (
-            supabase.table("patients")
-            .select("*", count="exact")
+        query = (
+            apply_filters(supabase.table("patients").select(select, count=count_mode if inline_count else None), filters)
             .order("urgency_score", desc=True)
-            .range(offset, offset + limit - 1)
-            .execute()
+            .order("created_at")
+            .order("id")
         )
-        return result.data or [], result.count or 0
+        if after:
+            # Keyset page: seek past the cursor (same cost as page 1)
+            query = _after_patient_cursor(query, after).limit(limit + 1)
+        else:
+            query = query.range(offset, offset + limit)
+
+        if needs_count and not inline_count:
+            result, count_result = await asyncio.gather(
+                execute(query),
+                execute(apply_filters(supabase.table("patients").select("id", count=count_mode), filters).limit(1)),
+            )
+            total = count_result.count
+        else:
+            result = await execute(query)
+            if inline_count:
+                total = result.count
+        remember_count(cache_key, count_mode, total)
+
+        rows = result.data or []
+        next_cursor = encode_cursor(rows[limit - 1], PATIENT_CURSOR_KEYS) if len(rows) > limit else None
+        return rows[:limit], total, next_cursor
     except Exception as e:
         if _table_missing(e):
             logger.warning("patients table does not exist yet - returning empty list.")
-            return [], 0
+            return [], 0, None
         raise
 
 
 @retry_db_operation(max_retries=2, delay=1.0)
-async def get_patient_by_id(supabase: Client, patient_id: str) -> dict | None:
-    """Fetch a single patient by ID."""
+async def get_patients_by_ids(
+    supabase: Client, ids: list[str], columns: tuple[str, ...] | None = None
+) -> list[dict]:
+    """
+    Fetch the given patients in one primary-key lookup, returned in the order
+    of `ids` (e.g. the triage queue's); ids no longer in the table are skipped.
+    """
+    if not ids:
+        return []
+    select = ",".join(dict.fromkeys(["id", *columns, "updated_at"])) if columns else PATIENT_COLUMNS
+    try:
+        result = await execute(supabase.table("patients").select(select).in_("id", ids))
+    except Exception as e:
+        if _table_missing(e):
+            return []
+        raise
+    by_id = {str(row["id"]): row for row in result.data or []}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+@retry_db_operation(max_retries=2, delay=1.0)
+async def search_patients(
+    supabase: Client, query: str, limit: int = 20, offset: int = 0
+) -> tuple[list[dict], bool]:
+    """
+    Ranked full-text + fuzzy-name search via the `search_patients` SQL function.
+    Returns (rows, has_more); each row carries its `rank`.
+    """
     try:
-        result = (
+        result = await execute(
+            supabase.rpc("search_patients", {"p_query": query, "p_limit": limit + 1, "p_offset": offset})
+        )
+        rows = [{**hit["row_data"], "rank": hit["rank"]} for hit in result.data or []]
+    except Exception as e:
+        if _table_missing(e):
+            return [], False
+        # Function not deployed yet: unranked substring match (no index)
+        logger.warning(f"search_patients RPC unavailable, using ILIKE fallback: {e}")
+        pattern = quote(f"*{query}*")
+        result = await execute(
             supabase.table("patients")
-            .select("*")
-            .eq("id", patient_id)
-            .single()
-            .execute()
+            .select(PATIENT_COLUMNS)
+            .or_(f"name.ilike.{pattern},symptoms.ilike.{pattern}")
+            .order("created_at", desc=True)
+            .range(offset, offset + limit)
         )
-        return result.data
+        rows = [{**row, "rank": None} for row in result.data or []]
+    return rows[:limit], len(rows) > limit
+
+
+@retry_db_operation(max_retries=2, delay=1.0)
+async def get_patient_by_id(
+    supabase: Client, patient_id: str, prescriptions_limit: int = 0
+) -> dict | None:
+    """
+    Fetch a single patient by ID.
+    With `prescriptions_limit`, the patient's newest prescriptions are embedded
+    in the same request (PostgREST join over prescriptions.patient_id) as
+    `prescriptions`, plus `prescriptions_next_cursor` when there are more.
+    """
+    columns = PATIENT_COLUMNS
+    if prescriptions_limit:
+        columns += f",prescriptions({PRESCRIPTION_COLUMNS})"
+    try:
+        query = supabase.table("patients").select(columns).eq("id", patient_id)
+        if prescriptions_limit:
+            # order(foreign_table=) emits the parent-level order=prescriptions(col)
+            # form, which PostgREST reads as a to-one sort; set the embed's own order
+            query.params = query.params.add("prescriptions.order", "created_at.desc,id.desc")
+            query = query.limit(prescriptions_limit + 1, foreign_table="prescriptions")
+        result = await execute(query.single())
     except Exception as e:
         if _table_missing(e):
             logger.warning("patients table does not exist yet.")
             return None
         raise
+    row = result.data
+    if row and prescriptions_limit:
+        prescriptions = row.get("prescriptions") or []
+        row["prescriptions"] = prescriptions[:prescriptions_limit]
+        row["prescriptions_next_cursor"] = (
+            encode_cursor(prescriptions[prescriptions_limit - 1], PRESCRIPTION_CURSOR_KEYS)
+            if len(prescriptions) > prescriptions_limit else None
+        )
+    return row
+
+
+@retry_db_operation(max_retries=2, delay=1.0)
+async def patient_exists(supabase: Client, patient_id: str) -> bool:
+    """Primary-key probe (no columns beyond id)."""
+    try:
+        result = await execute(supabase.table("patients").select("id").eq("id", patient_id).limit(1))
+    except Exception as e:
+        if _table_missing(e):
+            return False
+        raise
+    return bool(result.data)
 
 
 @retry_db_operation(max_retries=2, delay=1.0)
 async def delete_patient(supabase: Client, patient_id: str) -> bool:
     """Delete a patient record. Returns True if successful."""
     try:
-        result = supabase.table("patients").delete().eq("id", patient_id).execute()
+        result = await execute(supabase.table("patients").delete().eq("id", patient_id))
+        if result.data:
+            invalidate_stats_cache()
+            invalidate_counts("patients")
+            invalidate_counts("prescriptions")  # ON DELETE CASCADE
+            get_triage_queue().remove(patient_id)
+            publish_change("patients", "delete", patient_id)
         return bool(result.data)
     except Exception as e:
         if _table_missing(e):
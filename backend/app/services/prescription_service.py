@@ -9,6 +9,20 @@ import httpx
 from datetime import date
 from supabase import Client
 
+from app.services.db import execute, run_sync
+from app.services.pagination import (
+    encode_cursor,
+    decode_cursor,
+    quote,
+    apply_filters,
+    count_key,
+    cached_count,
+    remember_count,
+    invalidate_counts,
+)
+from app.services.dashboard_service import invalidate_stats_cache
+from app.services.events import publish_change
+
 logger = logging.getLogger(__name__)
 
 def retry_db_operation(max_retries: int = 2, delay: float = 1.0):
@@ -37,6 +51,16 @@ def retry_db_operation(max_retries: int = 2, delay: float = 1.0):
     return decorator
 
 
+# Fields carried by insert events (medications are fetched on demand)
+EVENT_FIELDS = ("patient_name", "patient_id", "date", "status", "created_at")
+
+
+def _on_insert(row: dict) -> None:
+    """Announce a newly stored prescription to live clients."""
+    if row:
+        publish_change("prescriptions", "insert", row["id"], {f: row.get(f) for f in EVENT_FIELDS if f in row})
+
+
 @retry_db_operation(max_retries=2, delay=1.0)
 async def create_prescription(
     supabase: Client,
@@ -65,50 +89,125 @@ async def create_prescription(
         payload["patient_id"] = patient_id
 
     try:
-        result = supabase.table("prescriptions").insert(payload).execute()
-        return result.data[0] if result.data else {}
+        result = await execute(supabase.table("prescriptions").insert(payload))
+        invalidate_stats_cache()
+        invalidate_counts("prescriptions")
+        row = result.data[0] if result.data else {}
+        _on_insert(row)
+        return row
     except Exception as e:
         logger.error(f"Failed to create prescription: {e}")
         # Fallback for missing columns (happen during migrations)
         if "extracted_patient_name" in str(e) or "extracted_age" in str(e):
              # Try inserting without extraction fields
              safe_payload = {k:v for k,v in payload.items() if not k.startswith("extracted_")}
-             result = supabase.table("prescriptions").insert(safe_payload).execute()
-             return result.data[0] if result.data else {}
+             result = await execute(supabase.table("prescriptions").insert(safe_payload))
+             invalidate_stats_cache()
+             invalidate_counts("prescriptions")
+             row = result.data[0] if result.data else {}
+             _on_insert(row)
+             return row
         raise
 
 
+# Every column the API reads (not "*": the search_vector column is never sent back)
+PRESCRIPTION_COLUMNS = (
+    "id,patient_id,patient_name,date,medications,status,extracted_patient_name,"
+    "extracted_age,extracted_gender,image_url,created_at,updated_at"
+)
+PRESCRIPTION_CURSOR_KEYS = ("created_at", "id")
+
+
 @retry_db_operation(max_retries=2, delay=1.0)
 async def get_prescriptions(
-    supabase: Client, limit: int = 50, offset: int = 0
-) -> tuple[list[dict], int]:
-    """Fetch prescriptions ordered by date descending."""
-    # Combine count and select into one optimized request if possible, 
-    # but for now, we just wrap them in the retry logic.
-    count_result = (
-        supabase.table("prescriptions").select("id", count="exact").execute()
-    )
-    total = count_result.count or 0
+    supabase: Client,
+    limit: int = 50,
+    offset: int = 0,
+    cursor: str | None = None,
+    count_mode: str = "exact",
+    filters: dict | None = None,
+) -> tuple[list[dict], int | None, str | None]:
+    """
+    Fetch prescriptions ordered by date descending.
+    Pages by keyset when `cursor` is given, otherwise by offset.
+    `filters` (status, patient_id, created_at_from/_to) run in the database.
+    Returns (rows, total_count, next_cursor); total is None for count_mode="none".
+    """
+    after = decode_cursor(cursor, PRESCRIPTION_CURSOR_KEYS) if cursor else None
+    cache_key = count_key("prescriptions", filters)
+    total = cached_count(cache_key, count_mode)
+    needs_count = count_mode != "none" and total is None
+    # Offset pages fetch data and count in a single request
+    inline_count = needs_count and not after
 
-    result = (
-        supabase.table("prescriptions")
-        .select("*")
+    query = (
+        apply_filters(supabase.table("prescriptions").select(PRESCRIPTION_COLUMNS, count=count_mode if inline_count else None), filters)
         .order("created_at", desc=True)
-        .range(offset, offset + limit - 1)
-        .execute()
+        .order("id", desc=True)
     )
-    return result.data or [], total
+    if after:
+        # The AND bound is what the index scan starts from; the OR alone is only a filter
+        created_at, row_id = quote(after["created_at"]), quote(after["id"])
+        query = query.lte("created_at", after["created_at"]).or_(
+            f"created_at.lt.{created_at},and(created_at.eq.{created_at},id.lt.{row_id})"
+        ).limit(limit + 1)
+    else:
+        query = query.range(offset, offset + limit)
+
+    if needs_count and not inline_count:
+        # Keyset pages are filtered, so the total needs its own (concurrent) count
+        result, count_result = await asyncio.gather(
+            execute(query),
+            execute(apply_filters(supabase.table("prescriptions").select("id", count=count_mode), filters).limit(1)),
+        )
+        total = count_result.count
+    else:
+        result = await execute(query)
+        if inline_count:
+            total = result.count
+    remember_count(cache_key, count_mode, total)
+
+    rows = result.data or []
+    next_cursor = encode_cursor(rows[limit - 1], PRESCRIPTION_CURSOR_KEYS) if len(rows) > limit else None
+    return rows[:limit], total, next_cursor
+
+
+@retry_db_operation(max_retries=2, delay=1.0)
+async def search_prescriptions(
+    supabase: Client, query: str, limit: int = 20, offset: int = 0
+) -> tuple[list[dict], bool]:
+    """
+    Ranked search over patient names, extracted names and drug names via the
+    `search_prescriptions` SQL function. Returns (rows, has_more); each row carries its `rank`.
+    """
+    try:
+        result = await execute(
+            supabase.rpc("search_prescriptions", {"p_query": query, "p_limit": limit + 1, "p_offset": offset})
+        )
+        rows = [{**hit["row_data"], "rank": hit["rank"]} for hit in result.data or []]
+    except Exception as e:
+        # Function not deployed yet: unranked substring match on names (no index)
+        logger.warning(f"search_prescriptions RPC unavailable, using ILIKE fallback: {e}")
+        pattern = quote(f"*{query}*")
+        result = await execute(
+            supabase.table("prescriptions")
+            .select(PRESCRIPTION_COLUMNS)
+            .or_(f"patient_name.ilike.{pattern},extracted_patient_name.ilike.{pattern}")
+            .order("created_at", desc=True)
+            .range(offset, offset + limit)
+        )
+        rows = [{**row, "rank": None} for row in result.data or []]
+    return rows[:limit], len(rows) > limit
 
 
 @retry_db_operation(max_retries=2, delay=1.0)
 async def get_prescription_by_id(supabase: Client, prescription_id: str) -> dict | None:
     """Fetch a single prescription by ID."""
-    result = (
+    result = await execute(
         supabase.table("prescriptions")
-        .select("*")
+        .select(PRESCRIPTION_COLUMNS)
         .eq("id", prescription_id)
         .single()
-        .execute()
     )
     return result.data
 
@@ -122,15 +221,81 @@ async def update_prescription_status(
     if new_status not in valid_statuses:
         raise ValueError(f"Invalid status. Must be one of: {valid_statuses}")
 
-    result = (
+    result = await execute(
         supabase.table("prescriptions")
         .update({"status": new_status})
         .eq("id", prescription_id)
-        .execute()
     )
+    if result.data:
+        invalidate_stats_cache()
+        invalidate_counts("prescriptions")
+        publish_change("prescriptions", "update", prescription_id, {"status": new_status})
     return result.data[0] if result.data else None
 
 
+# Allowed bulk moves: forward through the review flow; Verified is final
+STATUS_TRANSITIONS = {
+    "Pending": ("Digitized", "Verified"),
+    "Digitized": ("Verified",),
+    "Verified": (),
+}
+
+
+@retry_db_operation(max_retries=2, delay=1.0)
+async def bulk_update_prescription_status(
+    supabase: Client, prescription_ids: list[str], new_status: str
+) -> tuple[list[dict], list[dict]]:
+    """
+    Move many prescriptions to `new_status` with a single
+    UPDATE ... WHERE id IN (...) AND status IN (<allowed sources>).
+    The transition check runs inside the UPDATE, so the happy path is one
+    round trip; only ids left untouched are re-read to explain why.
+    Returns (updated_rows, results): one {id, result, status} per distinct id,
+    in request order, with result = updated | unchanged | invalid_transition | not_found.
+    """
+    if new_status not in STATUS_TRANSITIONS:
+        raise ValueError(f"Invalid status. Must be one of: {tuple(STATUS_TRANSITIONS)}")
+    ids = list(dict.fromkeys(prescription_ids))
+    sources = [s for s, targets in STATUS_TRANSITIONS.items() if new_status in targets]
+
+    updated: dict[str, dict] = {}
+    if sources:
+        result = await execute(
+            supabase.table("prescriptions")
+            .update({"status": new_status})
+            .in_("id", ids)
+            .in_("status", sources)
+        )
+        updated = {str(row["id"]): row for row in result.data or []}
+
+    current: dict[str, str] = {}
+    leftover = [i for i in ids if i not in updated]
+    if leftover:
+        result = await execute(supabase.table("prescriptions").select("id,status").in_("id", leftover))
+        current = {str(row["id"]): row["status"] for row in result.data or []}
+
+    results = []
+    for row_id in ids:
+        if row_id in updated:
+            outcome = "updated"
+        elif row_id not in current:
+            outcome = "not_found"
+        elif current[row_id] == new_status:
+            outcome = "unchanged"
+        else:
+            outcome = "invalid_transition"
+        status = new_status if row_id in updated else current.get(row_id)
+        results.append({"id": row_id, "result": outcome, "status": status})
+
+    if updated:
+        invalidate_stats_cache()
+        invalidate_counts("prescriptions")
+        for row_id in updated:
+            publish_change("prescriptions", "update", row_id, {"status": new_status})
+        logger.info(f"✅ Bulk status → {new_status}: {len(updated)}/{len(ids)} prescriptions updated")
+    return list(updated.values()), results
+
+
 async def upload_prescription_image(
     supabase: Client, image_bytes: bytes, filename: str
 ) -> str:
@@ -139,21 +304,25 @@ async def upload_prescription_image(
     ext = filename.rsplit(".", 1)[-1] if "." in filename else "jpg"
     storage_path = f"prescriptions/{uuid.uuid4().hex}.{ext}"
 
-    supabase.storage.from_("prescription-images").upload(
+    bucket = supabase.storage.from_("prescription-images")
+    await run_sync(
+        bucket.upload,
         path=storage_path,
         file=image_bytes,
         file_options={"content-type": f"image/{ext}"},
     )
 
     # Get signed URL (valid 1 year)
-    signed = supabase.storage.from_("prescription-images").create_signed_url(
-        storage_path, 60 * 60 * 24 * 365
-    )
+    signed = await run_sync(bucket.create_signed_url, storage_path, 60 * 60 * 24 * 365)
     return signed.get("signedURL", "") if isinstance(signed, dict) else ""
 
 
 @retry_db_operation(max_retries=2, delay=1.0)
 async def delete_prescription(supabase: Client, prescription_id: str) -> bool:
     """Delete a prescription record."""
-    result = supabase.table("prescriptions").delete().eq("id", prescription_id).execute()
+    result = await execute(supabase.table("prescriptions").delete().eq("id", prescription_id))
+    if result.data:
+        invalidate_stats_cache()
+        invalidate_counts("prescriptions")
+        publish_change("prescriptions", "delete", prescription_id)
     return bool(result.data)
@@ -0,0 +1,79 @@
+"""
+Priority — Wait-aware effective priority for the triage queue.
+
+    effective = urgency_score + min(cap, AGING_POINTS_PER_HOUR * hours past the expected wait)
+
+The aging bonus is bounded: a patient can climb at most to the floor of the
+next urgency band, never above the Critical floor, so a long wait cannot
+outrank someone who is genuinely more urgent. Only patients who arrived
+within AGING_WINDOW_HOURS age at all — older rows are history, not a queue.
+
+Because the bonus saturates, the ordering changes with the clock and cannot
+be stored or indexed: the DB lists patients in static triage order
+(urgency_score, created_at, id) and the in-memory triage queue applies the
+wait-aware order, re-ranked once per PRIORITY_BUCKET_SECONDS.
+"""
+
+import time
+from datetime import datetime
+
+AGING_POINTS_PER_HOUR = 15.0
+AGING_WINDOW_HOURS = 12.0
+DEFAULT_WAIT_MINUTES = 30
+# Medium / High / Critical floors, as in agents.prioritization._score_to_level
+BAND_FLOORS = (26, 56, 81)
+CRITICAL_FLOOR = BAND_FLOORS[-1]
+# Effective priority is evaluated per bucket: the triage queue re-ranks, and
+# ETags of responses carrying it change, on bucket boundaries
+PRIORITY_BUCKET_SECONDS = 60
+
+
+def epoch_seconds(created_at) -> float:
+    """created_at (ISO string, datetime or epoch seconds) as epoch seconds."""
+    if isinstance(created_at, (int, float)):
+        return float(created_at)
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    return created_at.timestamp()
+
+
+def in_aging_window(created_at, now: float | None = None) -> bool:
+    """Whether a patient who arrived at `created_at` still counts as waiting."""
+    now = time.time() if now is None else now
+    return now - epoch_seconds(created_at) <= AGING_WINDOW_HOURS * 3600
+
+
+def aging_cap(urgency_score: int) -> float:
+    """Most points a wait can add: up to the next band's floor, never past Critical."""
+    ceiling = next((floor for floor in BAND_FLOORS if floor > urgency_score), urgency_score)
+    return float(max(0, min(ceiling, CRITICAL_FLOOR) - urgency_score))
+
+
+def aging_bonus(urgency_score: int, created_at, wait_minutes: int | None, now: float | None = None) -> float:
+    now = time.time() if now is None else now
+    if not in_aging_window(created_at, now):
+        return 0.0
+    wait = DEFAULT_WAIT_MINUTES if wait_minutes is None else wait_minutes
+    overdue_hours = (now - epoch_seconds(created_at) - wait * 60) / 3600
+    return min(aging_cap(urgency_score), max(0.0, AGING_POINTS_PER_HOUR * overdue_hours))
+
+
+def effective_priority(urgency_score: int, created_at, wait_minutes: int | None, now: float | None = None) -> float:
+    """Current effective priority (rounded for display)."""
+    return round(urgency_score + aging_bonus(urgency_score, created_at, wait_minutes, now), 1)
+
+
+def row_effective_priority(row: dict, now: float | None = None) -> float:
+    return effective_priority(row["urgency_score"], row["created_at"], row.get("wait_minutes"), now)
+
+
+def etag_bucket(rows: list[dict], now: float | None = None) -> int | None:
+    """
+    Time component for ETags over rows that carry effective_priority: the
+    current PRIORITY_BUCKET_SECONDS bucket while any row is inside the aging
+    window, None once every value is settled.
+    """
+    now = time.time() if now is None else now
+    if any(in_aging_window(r["created_at"], now) for r in rows):
+        return int(now // PRIORITY_BUCKET_SECONDS)
+    return None
@@ -0,0 +1,178 @@
+"""
+Triage Queue — In-process index of waiting patients.
+Holds the patients who arrived within the aging window (see services/priority.py)
+and answers "who is next" in wait-aware order without touching the database.
+It is loaded at startup, kept in sync by patient_service's create/delete
+paths, and periodically rebuilt from the DB to pick up writes made by other
+workers or directly in SQL. Older rows and bulk imports (history) never enter it.
+"""
+
+import asyncio
+import bisect
+import logging
+import time
+from datetime import datetime, timezone
+from supabase import Client
+
+from app.config import get_settings
+from app.services.db import execute
+from app.services.priority import (
+    AGING_WINDOW_HOURS,
+    PRIORITY_BUCKET_SECONDS,
+    effective_priority,
+    epoch_seconds,
+    in_aging_window,
+)
+
+logger = logging.getLogger(__name__)
+
+# Columns held per entry — what the triage desk shows
+QUEUE_FIELDS = (
+    "id", "name", "avatar", "urgency_score", "urgency_level", "wait_time", "wait_minutes", "created_at",
+)
+LOAD_BATCH_SIZE = 1000
+
+
+def _entry(row: dict) -> dict:
+    entry = {f: row.get(f) for f in QUEUE_FIELDS}
+    entry["id"] = str(row["id"])
+    entry["_ts"] = epoch_seconds(row["created_at"])  # parsed once, not per ranking
+    return entry
+
+
+def _key(entry: dict, at: float) -> tuple:
+    # Effective priority, then raw urgency (an aged patient ties below a truly Critical one), then FIFO
+    score = int(entry["urgency_score"])
+    return (-effective_priority(score, entry["_ts"], entry["wait_minutes"], at), -score, entry["_ts"], entry["id"])
+
+
+class TriageQueue:
+    """
+    Effective priority only moves with the clock, and only matters at
+    PRIORITY_BUCKET_SECONDS granularity: the order is rebuilt once per bucket
+    (O(n log n) over the few hundred patients of one window) and kept in
+    between — peek is O(1), top(k) O(k), and writes bisect into it.
+    """
+
+    def __init__(self):
+        self._rows: dict[str, dict] = {}
+        self._order: list[tuple] = []  # sorted _key()s as of self._ranked_at
+        self._bucket: int | None = None  # None: order must be rebuilt
+        self._ranked_at = 0.0
+        # Writes seen while a reload is reading the DB, replayed on top of its snapshot
+        self._journal: list[tuple[str, dict | str]] | None = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _rank(self, now: float) -> None:
+        """Rebuild the order when a new bucket starts (dropping patients past the window)."""
+        bucket = int(now // PRIORITY_BUCKET_SECONDS)
+        if bucket == self._bucket:
+            return
+        self._bucket, self._ranked_at = bucket, bucket * PRIORITY_BUCKET_SECONDS
+        self._rows = {i: e for i, e in self._rows.items() if in_aging_window(e["_ts"], self._ranked_at)}
+        for entry in self._rows.values():
+            entry["_key"] = _key(entry, self._ranked_at)
+        self._order = sorted(e["_key"] for e in self._rows.values())
+
+    def _discard(self, patient_id: str) -> dict | None:
+        entry = self._rows.pop(patient_id, None)
+        if entry is not None and self._bucket is not None:
+            i = bisect.bisect_left(self._order, entry["_key"])
+            if i < len(self._order) and self._order[i] == entry["_key"]:
+                del self._order[i]
+        return entry
+
+    def _public(self, key: tuple) -> dict:
+        """Queue entry as returned by the API (effective priority as of this bucket)."""
+        entry = self._rows[key[-1]]
+        return {**{f: entry[f] for f in QUEUE_FIELDS}, "effective_priority": round(-key[0], 1)}
+
+    def begin_reload(self) -> None:
+        self._journal = []
+
+    def abort_reload(self) -> None:
+        self._journal = None
+
+    def replace_all(self, rows: list[dict]) -> None:
+        journal, self._journal = self._journal or [], None
+        self._rows = {str(r["id"]): _entry(r) for r in rows}
+        self._bucket = None
+        for op, arg in journal:
+            self.add(arg) if op == "add" else self.remove(arg)
+
+    def add(self, row: dict) -> None:
+        """Insert or re-prioritize a patient (ignored once outside the aging window)."""
+        if self._journal is not None:
+            self._journal.append(("add", row))
+        entry = _entry(row)
+        self._discard(entry["id"])
+        if not in_aging_window(entry["_ts"]):
+            return
+        self._rows[entry["id"]] = entry
+        if self._bucket is not None:
+            entry["_key"] = _key(entry, self._ranked_at)
+            bisect.insort(self._order, entry["_key"])
+
+    def remove(self, patient_id: str) -> None:
+        if self._journal is not None:
+            self._journal.append(("remove", patient_id))
+        self._discard(str(patient_id))
+
+    def peek(self) -> dict | None:
+        top = self.top(1)
+        return top[0] if top else None
+
+    def pop(self) -> dict | None:
+        patient = self.peek()
+        if patient is not None:
+            self._discard(patient["id"])
+        return patient
+
+    def top(self, k: int) -> list[dict]:
+        """The k highest-priority waiting patients, in order."""
+        self._rank(time.time())
+        return [self._public(key) for key in self._order[:k]]
+
+
+_queue = TriageQueue()
+
+
+def get_triage_queue() -> TriageQueue:
+    return _queue
+
+
+async def load_triage_queue(supabase: Client) -> None:
+    """(Re)build the queue from live (non-imported) patients inside the aging window, in id-ordered batches."""
+    since = datetime.fromtimestamp(time.time() - AGING_WINDOW_HOURS * 3600, timezone.utc).isoformat()
+    rows: list[dict] = []
+    last_id = None
+    _queue.begin_reload()
+    try:
+        while True:
+            query = (
+                supabase.table("patients").select(",".join(QUEUE_FIELDS))
+                .gte("created_at", since).eq("imported", False).order("id").limit(LOAD_BATCH_SIZE)
+            )
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            batch = (await execute(query)).data or []
+            rows.extend(batch)
+            if len(batch) < LOAD_BATCH_SIZE:
+                break
+            last_id = batch[-1]["id"]
+    except Exception as e:
+        logger.warning(f"⚠️  Triage queue load failed, keeping previous index: {e}")
+        _queue.abort_reload()
+        return
+    _queue.replace_all(rows)
+    logger.info(f"🩺 Triage queue loaded ({len(rows)} patients)")
+
+
+async def reconcile_triage_queue(supabase: Client) -> None:
+    """Background task: periodically rebuild the queue from the DB."""
+    interval = get_settings().TRIAGE_QUEUE_RECONCILE_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        await load_triage_queue(supabase)
@@ -0,0 +1,95 @@
+"""
+Microbenchmark — patient list serialization.
+
+Times one page of full patient rows through:
+  validated  PatientResponse models, FastAPI's serialize_response against the
+             response_model, then JSONResponse (what endpoints did before)
+  direct     _format_patient dicts + ORJSONResponse (what they do now)
+
+Run from backend/ with the app requirements installed (no Supabase or
+network access needed; env vars only have to be present):
+    python scripts/bench_serialization.py --rows 200 --repeat 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+for var in ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_SERVICE_ROLE_KEY", "GEMINI_API_KEY"):
+    os.environ.setdefault(var, "bench")
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+
+from app.models.patient import PatientListResponse, PatientResponse  # noqa: E402
+from app.routers.patients import _format_patient  # noqa: E402
+
+
+def sample_rows(n: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Patient {i}",
+            "age": 20 + i % 60,
+            "gender": ("Male", "Female", "Other")[i % 3],
+            "symptoms": "Fever, productive cough and shortness of breath for three days",
+            "urgency_score": i % 100,
+            "urgency_level": "Medium",
+            "wait_time": "20 min",
+            "wait_minutes": 20,
+            "max_risk_score": 72,
+            "high_risk": True,
+            "avatar": "PT",
+            "history": ["Hypertension", "Type 2 diabetes"],
+            "risk_scores": [
+                {"condition": "Pneumonia", "score": 72, "level": "High", "reason": "Fever with productive cough"},
+                {"condition": "Sepsis", "score": 30, "level": "Medium", "reason": "Borderline vitals"},
+            ],
+            "ai_summary": {
+                "clinical_summary_en": "Likely lower respiratory tract infection; assess for pneumonia.",
+                "clinical_summary_ur": "ممکنہ طور پر نچلے سانس کی نالی کا انفیکشن۔",
+                "patient_friendly_summary": "You may have a chest infection.",
+                "suggested_actions": ["Chest X-ray", "CBC", "SpO2 monitoring"],
+            },
+            "created_at": (now - timedelta(minutes=i)).isoformat(),
+            "updated_at": now.isoformat(),
+        }
+        for i in range(n)
+    ]
+
+
+async def validated(rows: list[dict], field) -> bytes:
+    content = {"patients": [PatientResponse(**_format_patient(r)) for r in rows], "total": len(rows)}
+    data = await serialize_response(field=field, response_content=content)
+    return JSONResponse(data).body
+
+
+async def direct(rows: list[dict]) -> bytes:
+    return ORJSONResponse({"patients": [_format_patient(r) for r in rows], "total": len(rows)}).body
+
+
+async def main(n_rows: int, repeat: int) -> None:
+    rows = sample_rows(n_rows)
+    field = create_model_field(name="Response", type_=PatientListResponse, mode="serialization")
+    for name, run in (("validated", lambda: validated(rows, field)), ("direct", lambda: direct(rows))):
+        await run()  # warm-up
+        start = time.perf_counter()
+        for _ in range(repeat):
+            await run()
+        per_page = (time.perf_counter() - start) / repeat
+        print(f"{name:>9}: {per_page * 1e3:7.2f} ms/page  {per_page / n_rows * 1e6:6.1f} us/row")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
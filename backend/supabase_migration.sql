@@ -1,6 +1,7 @@
 -- ============================================================
 -- Tandarust AI — Supabase Database Setup
 -- Run this SQL in your Supabase SQL Editor (Dashboard → SQL)
+-- Idempotent: re-run the whole file to upgrade an existing database.
 -- ============================================================
 
 -- ── 1. Profiles table (linked to Supabase Auth) ─────
@@ -49,7 +50,10 @@ CREATE TABLE IF NOT EXISTS public.patients (
     avatar TEXT NOT NULL DEFAULT '',
     history TEXT[] NOT NULL DEFAULT '{}',
     risk_scores JSONB NOT NULL DEFAULT '[]',
-    ai_summary TEXT NOT NULL DEFAULT '',
+    ai_summary JSONB,
+    wait_minutes INTEGER,
+    max_risk_score INTEGER NOT NULL DEFAULT 0,
+    high_risk BOOLEAN NOT NULL DEFAULT false,
     created_by UUID REFERENCES auth.users(id) ON DELETE SET NULL,
     created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
@@ -58,6 +62,82 @@ CREATE TABLE IF NOT EXISTS public.patients (
 -- Index for priority queue (most urgent first)
 CREATE INDEX IF NOT EXISTS idx_patients_urgency ON public.patients (urgency_score DESC);
 CREATE INDEX IF NOT EXISTS idx_patients_created_at ON public.patients (created_at DESC);
+-- Keyset pagination in triage order (urgency_score DESC, created_at, id).
+-- Wait-aware (aged) priority is bounded and time-dependent, so it is applied
+-- by the in-memory triage queue, not stored (see app/services/priority.py).
+CREATE INDEX IF NOT EXISTS idx_patients_queue_keyset ON public.patients (urgency_score DESC, created_at, id);
+
+-- Precomputed triage columns (set at insert time from agent output).
+-- Upgrade path for databases created before these columns existed:
+ALTER TABLE public.patients ADD COLUMN IF NOT EXISTS wait_minutes INTEGER;
+ALTER TABLE public.patients ADD COLUMN IF NOT EXISTS max_risk_score INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE public.patients ADD COLUMN IF NOT EXISTS high_risk BOOLEAN NOT NULL DEFAULT false;
+
+-- One-time backfill from the free-text wait_time and JSONB risk_scores
+UPDATE public.patients SET
+    wait_minutes = CASE
+        WHEN wait_time = 'Immediate' THEN 0
+        WHEN wait_time LIKE '%min%' AND wait_time ~ '\d'
+            THEN regexp_replace(wait_time, '\D', '', 'g')::int
+    END,
+    max_risk_score = COALESCE((
+        -- Fractional scores count too, truncated like int() in max_risk_score()
+        SELECT max(trunc((r ->> 'score')::numeric)::int)
+        FROM jsonb_array_elements(risk_scores) AS r
+        WHERE (r ->> 'score') ~ '^\d+(\.\d+)?$'
+    ), 0)
+WHERE wait_minutes IS NULL AND max_risk_score = 0;
+UPDATE public.patients SET high_risk = (max_risk_score >= 70) WHERE high_risk <> (max_risk_score >= 70);
+
+CREATE INDEX IF NOT EXISTS idx_patients_high_risk ON public.patients (created_at DESC) WHERE high_risk;
+CREATE INDEX IF NOT EXISTS idx_patients_wait_minutes ON public.patients (wait_minutes);
+
+-- Upgrade path: drop the unbounded-aging priority column and its helper
+-- (indexes on the column go with it and are recreated below on urgency_score)
+ALTER TABLE public.patients DROP COLUMN IF EXISTS priority_base;
+DROP FUNCTION IF EXISTS public.triage_priority_base(INTEGER, TIMESTAMPTZ, INTEGER);
+
+-- ai_summary as JSONB (the API stores/returns the AISummary object as-is).
+-- Upgrade path for databases where it is still TEXT: JSON strings are cast,
+-- legacy plain-text summaries are wrapped into the AISummary shape, '' → NULL.
+CREATE OR REPLACE FUNCTION public._legacy_summary_to_jsonb(summary TEXT)
+RETURNS JSONB
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+BEGIN
+    IF summary IS NULL OR btrim(summary) = '' THEN
+        RETURN NULL;
+    END IF;
+    BEGIN
+        IF jsonb_typeof(summary::jsonb) = 'object' THEN
+            RETURN summary::jsonb;
+        END IF;
+    EXCEPTION WHEN invalid_text_representation THEN
+        NULL;  -- not JSON: fall through to the legacy wrapper
+    END;
+    RETURN jsonb_build_object(
+        'clinical_summary_en', summary,
+        'clinical_summary_ur', 'قدیم ڈیٹا کیلئے خلاصہ دستیاب نہیں ہے۔',
+        'patient_friendly_summary', 'Legacy summary data.',
+        'suggested_actions', jsonb_build_array('Review legacy data')
+    );
+END;
+$$;
+
+DO $$
+BEGIN
+    IF (SELECT data_type FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = 'patients' AND column_name = 'ai_summary') = 'text' THEN
+        ALTER TABLE public.patients ALTER COLUMN ai_summary DROP DEFAULT;
+        ALTER TABLE public.patients ALTER COLUMN ai_summary DROP NOT NULL;
+        ALTER TABLE public.patients
+            ALTER COLUMN ai_summary TYPE JSONB USING public._legacy_summary_to_jsonb(ai_summary);
+    END IF;
+END;
+$$;
+
+DROP FUNCTION IF EXISTS public._legacy_summary_to_jsonb(TEXT);
 
 
 -- ── 3. Prescriptions table ──────────────────────────
@@ -78,6 +158,8 @@ CREATE TABLE IF NOT EXISTS public.prescriptions (
 
 CREATE INDEX IF NOT EXISTS idx_prescriptions_status ON public.prescriptions (status);
 CREATE INDEX IF NOT EXISTS idx_prescriptions_date ON public.prescriptions (date DESC);
+-- Keyset pagination (created_at DESC, id DESC)
+CREATE INDEX IF NOT EXISTS idx_prescriptions_created_keyset ON public.prescriptions (created_at DESC, id DESC);
 
 
 -- ── 4. Row Level Security (RLS) ─────────────────────
@@ -88,22 +170,26 @@ ALTER TABLE public.patients ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.prescriptions ENABLE ROW LEVEL SECURITY;
 
 -- Profiles: users can read all profiles, update own
+DROP POLICY IF EXISTS "Profiles are viewable by authenticated users" ON public.profiles;
 CREATE POLICY "Profiles are viewable by authenticated users"
     ON public.profiles FOR SELECT
     TO authenticated
     USING (true);
 
+DROP POLICY IF EXISTS "Users can update own profile" ON public.profiles;
 CREATE POLICY "Users can update own profile"
     ON public.profiles FOR UPDATE
     TO authenticated
     USING (auth.uid() = id);
 
 -- Patients: all authenticated users can read; doctors/admins can insert/update/delete
+DROP POLICY IF EXISTS "Patients are viewable by authenticated users" ON public.patients;
 CREATE POLICY "Patients are viewable by authenticated users"
     ON public.patients FOR SELECT
     TO authenticated
     USING (true);
 
+DROP POLICY IF EXISTS "Doctors and admins can insert patients" ON public.patients;
 CREATE POLICY "Doctors and admins can insert patients"
     ON public.patients FOR INSERT
     TO authenticated
@@ -114,6 +200,7 @@ CREATE POLICY "Doctors and admins can insert patients"
         )
     );
 
+DROP POLICY IF EXISTS "Doctors and admins can update patients" ON public.patients;
 CREATE POLICY "Doctors and admins can update patients"
     ON public.patients FOR UPDATE
     TO authenticated
@@ -124,6 +211,7 @@ CREATE POLICY "Doctors and admins can update patients"
         )
     );
 
+DROP POLICY IF EXISTS "Doctors and admins can delete patients" ON public.patients;
 CREATE POLICY "Doctors and admins can delete patients"
     ON public.patients FOR DELETE
     TO authenticated
@@ -135,11 +223,13 @@ CREATE POLICY "Doctors and admins can delete patients"
     );
 
 -- Prescriptions: all authenticated can read; doctors/admins can manage
+DROP POLICY IF EXISTS "Prescriptions are viewable by authenticated users" ON public.prescriptions;
 CREATE POLICY "Prescriptions are viewable by authenticated users"
     ON public.prescriptions FOR SELECT
     TO authenticated
     USING (true);
 
+DROP POLICY IF EXISTS "Doctors and admins can insert prescriptions" ON public.prescriptions;
 CREATE POLICY "Doctors and admins can insert prescriptions"
     ON public.prescriptions FOR INSERT
     TO authenticated
@@ -150,6 +240,7 @@ CREATE POLICY "Doctors and admins can insert prescriptions"
         )
     );
 
+DROP POLICY IF EXISTS "Doctors and admins can update prescriptions" ON public.prescriptions;
 CREATE POLICY "Doctors and admins can update prescriptions"
     ON public.prescriptions FOR UPDATE
     TO authenticated
@@ -160,6 +251,7 @@ CREATE POLICY "Doctors and admins can update prescriptions"
         )
     );
 
+DROP POLICY IF EXISTS "Doctors and admins can delete prescriptions" ON public.prescriptions;
 CREATE POLICY "Doctors and admins can delete prescriptions"
     ON public.prescriptions FOR DELETE
     TO authenticated
@@ -181,12 +273,14 @@ VALUES ('prescription-images', 'prescription-images', false)
 ON CONFLICT (id) DO NOTHING;
 
 -- Storage policy: authenticated users can upload
+DROP POLICY IF EXISTS "Authenticated users can upload prescription images" ON storage.objects;
 CREATE POLICY "Authenticated users can upload prescription images"
     ON storage.objects FOR INSERT
     TO authenticated
     WITH CHECK (bucket_id = 'prescription-images');
 
 -- Storage policy: authenticated users can read
+DROP POLICY IF EXISTS "Authenticated users can read prescription images" ON storage.objects;
 CREATE POLICY "Authenticated users can read prescription images"
     ON storage.objects FOR SELECT
     TO authenticated
@@ -202,14 +296,149 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+DROP TRIGGER IF EXISTS set_patients_updated_at ON public.patients;
 CREATE TRIGGER set_patients_updated_at
     BEFORE UPDATE ON public.patients
     FOR EACH ROW EXECUTE FUNCTION public.update_updated_at();
 
+DROP TRIGGER IF EXISTS set_prescriptions_updated_at ON public.prescriptions;
 CREATE TRIGGER set_prescriptions_updated_at
     BEFORE UPDATE ON public.prescriptions
     FOR EACH ROW EXECUTE FUNCTION public.update_updated_at();
 
+DROP TRIGGER IF EXISTS set_profiles_updated_at ON public.profiles;
 CREATE TRIGGER set_profiles_updated_at
     BEFORE UPDATE ON public.profiles
     FOR EACH ROW EXECUTE FUNCTION public.update_updated_at();
+
+
+-- ── 7. Dashboard stats (single round trip) ──────────
+-- Computes every DashboardStats field server-side; called via
+-- supabase.rpc("get_dashboard_stats", {"p_today": ...}).
+CREATE INDEX IF NOT EXISTS idx_patients_urgency_level ON public.patients (urgency_level);
+
+CREATE OR REPLACE FUNCTION public.get_dashboard_stats(p_today DATE DEFAULT CURRENT_DATE)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+    SELECT json_build_object(
+        'total_patients', p.total,
+        'critical_patients', p.critical,
+        'pending_reviews', (SELECT count(*) FROM public.prescriptions WHERE status = 'Pending'),
+        'avg_wait_time', COALESCE(p.avg_wait, 0) || ' min',
+        'prescriptions_today', (SELECT count(*) FROM public.prescriptions WHERE date = p_today),
+        'risk_alerts', p.risk_alerts
+    )
+    FROM (
+        SELECT
+            count(*) AS total,
+            count(*) FILTER (WHERE urgency_level = 'Critical') AS critical,
+            round(avg(wait_minutes))::int AS avg_wait,
+            count(*) FILTER (WHERE high_risk) AS risk_alerts
+        FROM public.patients
+    ) p;
+$$;
+
+
+-- ── 8. Search (full-text + fuzzy names) ─────────────
+-- tsvector columns for ranked full-text search, pg_trgm for typo-tolerant
+-- name matching; both GIN-indexed. Called via supabase.rpc("search_patients")
+-- and supabase.rpc("search_prescriptions").
+CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA extensions;
+
+ALTER TABLE public.patients ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', COALESCE(name, '')), 'A') ||
+    setweight(to_tsvector('english', COALESCE(symptoms, '')), 'B')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_patients_search ON public.patients USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_patients_name_trgm ON public.patients USING GIN (name extensions.gin_trgm_ops);
+
+ALTER TABLE public.prescriptions ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', COALESCE(patient_name, '') || ' ' || COALESCE(extracted_patient_name, '')), 'A') ||
+    setweight(to_tsvector('english',
+        jsonb_path_query_array(medications, '$[*].drug')::text || ' ' ||
+        jsonb_path_query_array(medications, '$[*].generic_name')::text), 'B')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_prescriptions_search ON public.prescriptions USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_prescriptions_patient_name_trgm
+    ON public.prescriptions USING GIN (patient_name extensions.gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_prescriptions_extracted_name_trgm
+    ON public.prescriptions USING GIN (extracted_patient_name extensions.gin_trgm_ops);
+
+-- Rank = full-text rank + best fuzzy name similarity; rows are returned as JSON
+-- (minus search_vector) so the API formats them like any other listing.
+CREATE OR REPLACE FUNCTION public.search_patients(p_query TEXT, p_limit INTEGER DEFAULT 20, p_offset INTEGER DEFAULT 0)
+RETURNS TABLE (rank REAL, row_data JSONB)
+LANGUAGE sql
+STABLE
+SET search_path = public, extensions
+AS $$
+    WITH q AS (SELECT websearch_to_tsquery('english', p_query) AS tsq)
+    SELECT
+        (ts_rank_cd(p.search_vector, q.tsq) + word_similarity(p_query, p.name))::real AS rank,
+        to_jsonb(p) - 'search_vector' AS row_data
+    FROM public.patients p, q
+    WHERE p.search_vector @@ q.tsq OR p_query <% p.name
+    ORDER BY rank DESC, p.id
+    LIMIT p_limit OFFSET p_offset;
+$$;
+
+CREATE OR REPLACE FUNCTION public.search_prescriptions(p_query TEXT, p_limit INTEGER DEFAULT 20, p_offset INTEGER DEFAULT 0)
+RETURNS TABLE (rank REAL, row_data JSONB)
+LANGUAGE sql
+STABLE
+SET search_path = public, extensions
+AS $$
+    WITH q AS (SELECT websearch_to_tsquery('english', p_query) AS tsq)
+    SELECT
+        (ts_rank_cd(r.search_vector, q.tsq) + GREATEST(
+            word_similarity(p_query, r.patient_name),
+            word_similarity(p_query, COALESCE(r.extracted_patient_name, ''))
+        ))::real AS rank,
+        to_jsonb(r) - 'search_vector' AS row_data
+    FROM public.prescriptions r, q
+    WHERE r.search_vector @@ q.tsq
+       OR p_query <% r.patient_name
+       OR p_query <% r.extracted_patient_name
+    ORDER BY rank DESC, r.id
+    LIMIT p_limit OFFSET p_offset;
+$$;
+
+
+-- ── 9. Filtered listing indexes ─────────────────────
+-- Back the typed filters on GET /patients and GET /prescriptions; each index
+-- ends in the listing's sort key so filtered pages are read in order.
+CREATE INDEX IF NOT EXISTS idx_patients_level_queue
+    ON public.patients (urgency_level, urgency_score DESC, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_patients_critical_queue
+    ON public.patients (urgency_score DESC, created_at, id) WHERE urgency_level = 'Critical';
+CREATE INDEX IF NOT EXISTS idx_patients_created_by
+    ON public.patients (created_by, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_prescriptions_status_keyset
+    ON public.prescriptions (status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_prescriptions_pending
+    ON public.prescriptions (created_at DESC, id DESC) WHERE status = 'Pending';
+-- Also the patient_id index behind GET /patients/{id}?include=prescriptions,
+-- /patients/{id}/prescriptions and the ON DELETE CASCADE from patients.
+CREATE INDEX IF NOT EXISTS idx_prescriptions_patient_keyset
+    ON public.prescriptions (patient_id, created_at DESC, id DESC);
+
+
+-- ── 10. Bulk import ─────────────────────────────────
+-- Rows imported with deferred triage wait here until the background
+-- prioritization pass picks them up. Imported rows are history, not
+-- arrivals: the live triage queue skips them.
+ALTER TABLE public.patients ADD COLUMN IF NOT EXISTS triage_pending BOOLEAN NOT NULL DEFAULT false;
+ALTER TABLE public.patients ADD COLUMN IF NOT EXISTS imported BOOLEAN NOT NULL DEFAULT false;
+CREATE INDEX IF NOT EXISTS idx_patients_triage_pending
+    ON public.patients (created_at) WHERE triage_pending;
+
+
+-- ── 11. Export ──────────────────────────────────────
+-- Exports walk each table in (created_at, id) keyset batches; prescriptions
+-- reuse idx_prescriptions_created_keyset (scanned backwards).
+CREATE INDEX IF NOT EXISTS idx_patients_created_keyset
+    ON public.patients (created_at, id);
@@ -0,0 +1,51 @@
+import pytest
+
+from app.services.formulary import FormularyIndex, load_formulary
+
+
+@pytest.fixture(scope="module")
+def formulary():
+    return load_formulary()
+
+
+# A drug missing from the formulary must not be mapped onto its look-alike
+@pytest.mark.parametrize("raw", [
+    "Lorazepam",      # Clonazepam
+    "Dapagliflozin",  # Empagliflozin
+    "Erythromycin",   # Azithromycin
+    "Felodipine",     # Amlodipine
+    "Lansoprazole",   # Pantoprazole
+    "Citalopram",     # Escitalopram
+    "Prednisone",     # Prednisolone
+    "Desloratadine",  # Loratadine
+    "Vildagliptin",   # Sitagliptin
+    "Linagliptin",    # Sitagliptin
+])
+def test_look_alike_drugs_are_not_matched(formulary, raw):
+    assert formulary.match(raw) is None
+
+
+@pytest.mark.parametrize("raw, canonical_id", [
+    ("Paracetamoll", "RX-PARA"),
+    ("Amoxicilin", "RX-AMOX"),
+    ("Azithromicin", "RX-AZIT"),
+    ("Prednisolon", "RX-PRED"),
+    ("Tab Panadol 500mg", "RX-PARA"),
+])
+def test_small_ocr_slips_are_matched(formulary, raw, canonical_id):
+    assert formulary.match(raw)["canonical_id"] == canonical_id
+
+
+def test_exact_names_match_with_full_confidence(formulary):
+    assert formulary.match("Clonazepam") == {
+        "canonical_id": "RX-CLON", "generic_name": "Clonazepam", "match_confidence": 1.0,
+    }
+
+
+def test_name_close_to_two_drugs_is_left_unmatched():
+    index = FormularyIndex([
+        {"id": "RX-A", "generic": "Metoprolol"},
+        {"id": "RX-B", "generic": "Metoprolal"},
+    ])
+    assert index.match("Metoprolul") is None
+    assert index.match("Metoprolol")["canonical_id"] == "RX-A"
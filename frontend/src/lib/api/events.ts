@@ -0,0 +1,82 @@
+import { apiClient, tokenManager } from "./client";
+import type { ChangeEvent } from "./types";
+
+// ─────────────────────────────────────────────────────────────
+// Events API Module — live change feed (Server-Sent Events)
+// ─────────────────────────────────────────────────────────────
+
+const RECONNECT_DELAY_MS = 3000;
+const MAX_RECONNECT_DELAY_MS = 30000;
+
+/**
+ * Subscribe to patient/prescription changes.
+ * The access token travels in the URL (EventSource cannot send headers), so
+ * reconnects are handled here rather than by EventSource: each attempt
+ * refreshes the token if needed and resumes from the last event id.
+ * `onReset` fires when the server can no longer replay the gap and the
+ * caller should refetch. Returns an unsubscribe function.
+ */
+export function subscribeToChanges(
+  onChange: (event: ChangeEvent) => void,
+  options?: {
+    tables?: Array<ChangeEvent["table"]>;
+    onReset?: () => void;
+  }
+): () => void {
+  let source: EventSource | null = null;
+  let lastEventId: string | null = null;
+  let retryTimer: ReturnType<typeof setTimeout> | undefined;
+  let delay = RECONNECT_DELAY_MS;
+  let closed = false;
+
+  const connect = () => {
+    const params = new URLSearchParams({
+      token: tokenManager.getAccessToken() ?? "",
+    });
+    if (options?.tables?.length) {
+      params.set("tables", options.tables.join(","));
+    }
+    if (lastEventId) {
+      params.set("last_event_id", lastEventId);
+    }
+
+    source = new EventSource(
+      `${apiClient.defaults.baseURL}/events?${params.toString()}`
+    );
+    source.onopen = () => {
+      delay = RECONNECT_DELAY_MS;
+    };
+    source.onmessage = (message) => {
+      lastEventId = message.lastEventId || lastEventId;
+      onChange(JSON.parse(message.data) as ChangeEvent);
+    };
+    source.addEventListener("reset", (message) => {
+      lastEventId = (message as MessageEvent).lastEventId || lastEventId;
+      options?.onReset?.();
+    });
+    source.onerror = () => {
+      source?.close();
+      if (closed) return;
+      retryTimer = setTimeout(reconnect, delay);
+      delay = Math.min(delay * 2, MAX_RECONNECT_DELAY_MS);
+    };
+  };
+
+  const reconnect = async () => {
+    try {
+      // Any authenticated call renews an expired access token (client interceptor)
+      await apiClient.get("/auth/me");
+    } catch {
+      // Still retry: the stream fails again and backs off
+    }
+    if (!closed) connect();
+  };
+
+  connect();
+
+  return () => {
+    closed = true;
+    clearTimeout(retryTimer);
+    source?.close();
+  };
+}
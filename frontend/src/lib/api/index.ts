@@ -24,17 +24,30 @@ export {
 export {
   createPatient,
   getPatients,
+  getTriageQueue,
+  searchPatients,
   getPatientById,
+  getPatientPrescriptions,
   deletePatient,
+  voiceIntake,
 } from "./patients";
 
 // Prescriptions API
 export {
   uploadPrescription,
   getPrescriptions,
+  searchPrescriptions,
   getPrescriptionById,
   updatePrescriptionStatus,
+  bulkUpdatePrescriptionStatus,
 } from "./prescriptions";
 
 // Dashboard API
 export { getDashboardStats } from "./dashboard";
+
+// Events API
+export { subscribeToChanges } from "./events";
+
+// Voice API
+export { startVoiceStream, isVoiceStreamSupported } from "./voice";
+export type { VoiceStream } from "./voice";
@@ -2,8 +2,12 @@ import { apiClient } from "./client";
 import type {
   PatientCreateRequest,
   PatientResponse,
+  PatientDetailResponse,
   PatientListResponse,
+  PrescriptionListResponse,
+  PatientSearchResponse,
   PaginationParams,
+  PatientFilters,
   VoiceTranscriptionResponse,
 } from "./types";
 
@@ -22,28 +26,78 @@ export async function createPatient(
 }
 
 /**
- * Get all patients (with pagination)
+ * Get all patients (with pagination and optional filters).
+ * `fields` selects the returned columns ("*" for full records);
+ * the server defaults to a compact triage-list projection.
  */
 export async function getPatients(
-  params?: PaginationParams
+  params?: PaginationParams & PatientFilters & { fields?: string }
 ): Promise<PatientListResponse> {
   const response = await apiClient.get<PatientListResponse>("/patients", {
     params: {
+      ...params,
       limit: params?.limit ?? 50,
       offset: params?.offset ?? 0,
     },
+    // Repeat list filters as ?urgency_level=A&urgency_level=B
+    paramsSerializer: { indexes: null },
   });
   return response.data;
 }
 
+/**
+ * Waiting patients in wait-aware triage order (in-memory queue, last 12 h).
+ * With `fields`, full records are returned in that order.
+ */
+export async function getTriageQueue(
+  params?: { top?: number; fields?: string }
+): Promise<PatientListResponse> {
+  const response = await apiClient.get<PatientListResponse>(
+    "/patients/queue",
+    { params }
+  );
+  return response.data;
+}
+
+/**
+ * Ranked search over patient names (typo-tolerant) and symptoms
+ */
+export async function searchPatients(
+  query: string,
+  params?: { limit?: number; offset?: number; fields?: string }
+): Promise<PatientSearchResponse> {
+  const response = await apiClient.get<PatientSearchResponse>(
+    "/patients/search",
+    { params: { q: query, ...params } }
+  );
+  return response.data;
+}
+
 /**
  * Get a single patient by ID
+ * (include: "prescriptions" embeds their newest prescriptions in the same request)
  */
 export async function getPatientById(
-  patientId: string
-): Promise<PatientResponse> {
-  const response = await apiClient.get<PatientResponse>(
-    `/patients/${patientId}`
+  patientId: string,
+  params?: { include?: "prescriptions"; prescriptions_limit?: number },
+): Promise<PatientDetailResponse> {
+  const response = await apiClient.get<PatientDetailResponse>(
+    `/patients/${patientId}`,
+    { params },
+  );
+  return response.data;
+}
+
+/**
+ * Get one patient's prescriptions, newest first (keyset pagination)
+ */
+export async function getPatientPrescriptions(
+  patientId: string,
+  params?: { limit?: number; cursor?: string },
+): Promise<PrescriptionListResponse> {
+  const response = await apiClient.get<PrescriptionListResponse>(
+    `/patients/${patientId}/prescriptions`,
+    { params },
   );
   return response.data;
 }
@@ -75,3 +129,25 @@ export async function transcribeVoice(
   );
   return response.data;
 }
+
+/**
+ * One-shot voice intake — transcription, AI triage and patient creation in a
+ * single request. Rejects with 422 (and the partial extraction) when the
+ * recording is missing name, age, gender or symptoms, and with 502 when the
+ * transcription service fails.
+ */
+export async function voiceIntake(audioBlob: Blob): Promise<PatientResponse> {
+  const formData = new FormData();
+  formData.append("file", audioBlob, "recording.wav");
+
+  const response = await apiClient.post<PatientResponse>(
+    "/patients/voice-intake",
+    formData,
+    {
+      headers: {
+        "Content-Type": "multipart/form-data",
+      },
+    }
+  );
+  return response.data;
+}
@@ -2,8 +2,12 @@ import { apiClient } from "./client";
 import type {
   PrescriptionResponse,
   PrescriptionListResponse,
+  PrescriptionSearchResponse,
   PrescriptionStatusUpdate,
+  PrescriptionBulkStatusUpdate,
+  PrescriptionBulkStatusResponse,
   PaginationParams,
+  PrescriptionFilters,
 } from "./types";
 
 // ─────────────────────────────────────────────────────────────
@@ -39,18 +43,35 @@ export async function uploadPrescription(
 }
 
 /**
- * Get all prescriptions (with pagination)
+ * Ranked search over patient/extracted names and prescribed drugs
+ */
+export async function searchPrescriptions(
+  query: string,
+  params?: { limit?: number; offset?: number },
+): Promise<PrescriptionSearchResponse> {
+  const response = await apiClient.get<PrescriptionSearchResponse>(
+    "/prescriptions/search",
+    { params: { q: query, ...params } },
+  );
+  return response.data;
+}
+
+/**
+ * Get all prescriptions (with pagination and optional filters)
  */
 export async function getPrescriptions(
-  params?: PaginationParams,
+  params?: PaginationParams & PrescriptionFilters,
 ): Promise<PrescriptionListResponse> {
   const response = await apiClient.get<PrescriptionListResponse>(
     "/prescriptions",
     {
       params: {
+        ...params,
         limit: params?.limit ?? 50,
         offset: params?.offset ?? 0,
       },
+      // Repeat list filters as ?status=A&status=B
+      paramsSerializer: { indexes: null },
     },
   );
   return response.data;
@@ -81,3 +102,17 @@ export async function updatePrescriptionStatus(
   );
   return response.data;
 }
+
+/**
+ * Update the status of many prescriptions in one request
+ * (per-id results report missing ids and disallowed transitions)
+ */
+export async function bulkUpdatePrescriptionStatus(
+  body: PrescriptionBulkStatusUpdate,
+): Promise<PrescriptionBulkStatusResponse> {
+  const response = await apiClient.patch<PrescriptionBulkStatusResponse>(
+    "/prescriptions/status",
+    body,
+  );
+  return response.data;
+}
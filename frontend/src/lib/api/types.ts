@@ -106,6 +106,7 @@ export interface PatientResponse {
   urgency_score: number;
   urgency_level?: "Low" | "Medium" | "High" | "Critical";
   wait_time?: string;
+  effective_priority?: number; // urgency_score adjusted for time waited
   avatar?: string;
   history?: string[];
   medical_history?: string;
@@ -119,9 +120,20 @@ export interface PatientResponse {
   user_id?: string;
 }
 
+export interface PatientDetailResponse extends PatientResponse {
+  prescriptions?: PrescriptionResponse[]; // with include=prescriptions, newest first
+  prescriptions_next_cursor?: string | null;
+}
+
 export interface PatientListResponse {
   patients: PatientResponse[];
   total: number;
+  next_cursor?: string | null;
+}
+
+export interface PatientSearchResponse {
+  patients: Array<PatientResponse & { rank: number | null }>;
+  next_offset: number | null;
 }
 
 // ═══════════════════════════════════════════════════════════════
@@ -133,12 +145,20 @@ export interface PrescriptionMedication {
   dosage: string;
   frequency: string;
   duration: string;
+  canonical_id?: string | null;
+  generic_name?: string | null;
+  match_confidence?: number | null;
 }
 
 export interface PrescriptionStatusUpdate {
   status: "Pending" | "Digitized" | "Verified";
 }
 
+export interface PrescriptionBulkStatusUpdate {
+  ids: string[];
+  status: "Pending" | "Digitized" | "Verified";
+}
+
 export interface PrescriptionResponse {
   id: string;
   patient_name: string;
@@ -152,9 +172,26 @@ export interface PrescriptionResponse {
   created_at?: string;
 }
 
+export interface PrescriptionBulkStatusResponse {
+  status: "Pending" | "Digitized" | "Verified";
+  updated: number;
+  results: Array<{
+    id: string;
+    result: "updated" | "unchanged" | "invalid_transition" | "not_found";
+    status: string | null;
+  }>;
+  prescriptions: PrescriptionResponse[]; // the rows that changed
+}
+
 export interface PrescriptionListResponse {
   prescriptions: PrescriptionResponse[];
   total: number;
+  next_cursor?: string | null;
+}
+
+export interface PrescriptionSearchResponse {
+  prescriptions: Array<PrescriptionResponse & { rank: number | null }>;
+  next_offset: number | null;
 }
 
 // ═══════════════════════════════════════════════════════════════
@@ -170,6 +207,14 @@ export interface DashboardStats {
   risk_alerts: number;
 }
 
+export interface ChangeEvent {
+  id: string; // "<boot id>-<sequence>"; opaque to clients
+  table: "patients" | "prescriptions";
+  op: "insert" | "update" | "delete" | "import"; // import: bulk load, refetch
+  row_id: string;
+  fields: Record<string, unknown>;
+}
+
 // ═══════════════════════════════════════════════════════════════
 // API ERROR TYPES
 // ═══════════════════════════════════════════════════════════════
@@ -185,6 +230,21 @@ export interface APIError {
 export interface PaginationParams {
   limit?: number;
   offset?: number;
+  cursor?: string;
+}
+
+export interface PatientFilters {
+  urgency_level?: Array<"Low" | "Medium" | "High" | "Critical">;
+  created_after?: string; // ISO timestamp, inclusive
+  created_before?: string; // ISO timestamp, exclusive
+  created_by?: string;
+}
+
+export interface PrescriptionFilters {
+  status?: Array<"Pending" | "Digitized" | "Verified">;
+  patient_id?: string;
+  created_after?: string;
+  created_before?: string;
 }
 
 export interface VoiceTranscriptionResponse {
@@ -194,3 +254,10 @@ export interface VoiceTranscriptionResponse {
   symptoms: string;
   raw_transcription: string;
 }
+
+// Pushed by /patients/voice-stream as each pause-delimited segment is transcribed
+export interface VoiceStreamPartial {
+  segment: number;
+  symptoms: string;
+  raw_transcription: string;
+}
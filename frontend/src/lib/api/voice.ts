@@ -0,0 +1,173 @@
+import { apiClient, tokenManager } from "./client";
+import type { VoiceStreamPartial, VoiceTranscriptionResponse } from "./types";
+
+// ─────────────────────────────────────────────────────────────
+// Voice API Module — streaming intake (WebSocket, 16 kHz PCM)
+// ─────────────────────────────────────────────────────────────
+
+const TARGET_SAMPLE_RATE = 16000;
+const CHUNK_SAMPLES = 1600; // 100 ms per binary frame
+
+// Runs on the audio thread: averages each input window down to 16 kHz mono
+// and posts int16 chunks back to the main thread.
+const DOWNSAMPLER_SOURCE = `
+class PcmDownsampler extends AudioWorkletProcessor {
+  constructor() {
+    super();
+    this.step = sampleRate / ${TARGET_SAMPLE_RATE};
+    this.pos = 0;
+    this.acc = 0;
+    this.count = 0;
+    this.out = new Int16Array(${CHUNK_SAMPLES});
+    this.len = 0;
+  }
+  process(inputs) {
+    const channel = inputs[0] && inputs[0][0];
+    if (!channel) return true;
+    for (let i = 0; i < channel.length; i++) {
+      this.acc += channel[i];
+      this.count++;
+      if (++this.pos < this.step) continue;
+      this.pos -= this.step;
+      const s = Math.max(-1, Math.min(1, this.acc / this.count));
+      this.out[this.len++] = s < 0 ? s * 0x8000 : s * 0x7fff;
+      this.acc = 0;
+      this.count = 0;
+      if (this.len === this.out.length) {
+        this.port.postMessage(this.out.buffer, [this.out.buffer]);
+        this.out = new Int16Array(${CHUNK_SAMPLES});
+        this.len = 0;
+      }
+    }
+    return true;
+  }
+}
+registerProcessor("pcm-downsampler", PcmDownsampler);
+`;
+
+export interface VoiceStream {
+  /** Stop sending audio and wait for the server's final extraction */
+  stop: () => Promise<VoiceTranscriptionResponse>;
+  /** Abort without waiting for a result */
+  cancel: () => void;
+}
+
+/**
+ * Whether this browser can capture raw PCM for the streaming endpoint;
+ * callers fall back to recording a clip and calling transcribeVoice.
+ */
+export function isVoiceStreamSupported(): boolean {
+  return typeof AudioWorkletNode !== "undefined" && typeof WebSocket !== "undefined";
+}
+
+/**
+ * Stream microphone audio to /patients/voice-stream while recording.
+ * `onPartial` receives the running symptom summary after each pause, so the
+ * form fills in as the doctor speaks; `stop()` resolves with the final
+ * name/age/gender/symptoms extraction. `onError` reports a connection lost
+ * before stop(). The caller owns `media` and stops its tracks.
+ */
+export async function startVoiceStream(
+  media: MediaStream,
+  options?: {
+    onPartial?: (partial: VoiceStreamPartial) => void;
+    onError?: (error: Error) => void;
+  }
+): Promise<VoiceStream> {
+  // Any authenticated call renews an expired access token (client interceptor);
+  // the socket takes the token once, in the URL
+  await apiClient.get("/auth/me");
+
+  const params = new URLSearchParams({
+    token: tokenManager.getAccessToken() ?? "",
+  });
+  const socket = new WebSocket(
+    `${apiClient.defaults.baseURL!.replace(/^http/, "ws")}/patients/voice-stream?${params.toString()}`
+  );
+  const pending: ArrayBuffer[] = [];
+  let stopping = false;
+
+  const result = new Promise<VoiceTranscriptionResponse>((resolve, reject) => {
+    socket.onmessage = (message) => {
+      const data = JSON.parse(message.data);
+      if (data.type === "partial") {
+        options?.onPartial?.(data as VoiceStreamPartial);
+      } else if (data.type === "final") {
+        resolve({
+          name: data.name,
+          age: data.age,
+          gender: data.gender,
+          symptoms: data.symptoms,
+          raw_transcription: data.raw_transcription,
+        });
+      } else if (data.type === "error") {
+        reject(new Error(data.detail));
+      }
+    };
+    socket.onclose = (event) => {
+      // No-op once the final message has settled the promise
+      const error = new Error(
+        event.code === 1008 ? "Not authorized for voice intake" : "Voice stream closed unexpectedly"
+      );
+      if (!stopping) options?.onError?.(error);
+      reject(error);
+    };
+  });
+  result.catch(() => {}); // surfaced through stop() / onError
+
+  socket.onopen = () => {
+    pending.splice(0).forEach((chunk) => socket.send(chunk));
+  };
+
+  const context = new AudioContext();
+  const moduleUrl = URL.createObjectURL(
+    new Blob([DOWNSAMPLER_SOURCE], { type: "application/javascript" })
+  );
+  try {
+    await context.audioWorklet.addModule(moduleUrl);
+  } catch (err) {
+    stopping = true;
+    socket.close();
+    void context.close();
+    throw err;
+  } finally {
+    URL.revokeObjectURL(moduleUrl);
+  }
+  const source = context.createMediaStreamSource(media);
+  const downsampler = new AudioWorkletNode(context, "pcm-downsampler", {
+    numberOfOutputs: 0,
+  });
+  downsampler.port.onmessage = (message: MessageEvent<ArrayBuffer>) => {
+    if (socket.readyState === WebSocket.OPEN) {
+      socket.send(message.data);
+    } else if (socket.readyState === WebSocket.CONNECTING) {
+      pending.push(message.data);
+    }
+  };
+  source.connect(downsampler);
+
+  const release = () => {
+    source.disconnect();
+    downsampler.port.onmessage = null;
+    void context.close();
+  };
+
+  return {
+    stop: () => {
+      stopping = true;
+      release();
+      const sendStop = () => socket.send(JSON.stringify({ type: "stop" }));
+      if (socket.readyState === WebSocket.OPEN) {
+        sendStop();
+      } else if (socket.readyState === WebSocket.CONNECTING) {
+        socket.addEventListener("open", sendStop);
+      }
+      return result;
+    },
+    cancel: () => {
+      stopping = true;
+      release();
+      socket.close();
+    },
+  };
+}
@@ -10,13 +10,31 @@ import {
 import { Card } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Skeleton } from "@/components/ui/skeleton";
-import { getDashboardStats, getPatients } from "@/lib/api";
+import {
+  getDashboardStats,
+  getTriageQueue,
+  subscribeToChanges,
+} from "@/lib/api";
 import type { DashboardStats, PatientResponse } from "@/lib/api";
 import { useTranslation } from "react-i18next";
 import { StatsGrid } from "@/components/dashboard/StatsGrid";
 import { PatientQueue } from "@/components/dashboard/PatientQueue";
 import { RiskAlerts } from "@/components/dashboard/RiskAlerts";
 
+// Stats are aggregates: refresh once per burst of changes, not per event
+const STATS_REFRESH_DELAY_MS = 2000;
+// Waiting patients climb as they wait; the server re-ranks once a minute
+const QUEUE_REFRESH_MS = 60000;
+const QUEUE_SIZE = 20;
+const QUEUE_FIELDS =
+  "id,name,avatar,age,gender,symptoms,urgency_score,urgency_level,wait_time,effective_priority,risk_scores,ai_summary,created_at";
+
+// Same order as the server's queue: effective priority, then raw urgency
+const byPriority = (a: PatientResponse, b: PatientResponse) =>
+  (b.effective_priority ?? b.urgency_score) -
+    (a.effective_priority ?? a.urgency_score) ||
+  b.urgency_score - a.urgency_score;
+
 export function DoctorDashboard() {
   const { t } = useTranslation();
   const [stats, setStats] = useState<DashboardStats | null>(null);
@@ -30,13 +48,14 @@ export function DoctorDashboard() {
         setIsLoading(true);
         setError(null);
 
-        const [statsData, patientsData] = await Promise.all([
+        const [statsData, queueData] = await Promise.all([
           getDashboardStats(),
-          getPatients({ limit: 20 }),
+          getTriageQueue({ top: QUEUE_SIZE, fields: QUEUE_FIELDS }),
         ]);
 
         setStats(statsData);
-        setPatients(patientsData.patients);
+        // Already in wait-aware order (effective priority) from the server
+        setPatients(queueData.patients);
       } catch (err) {
         console.error("Failed to fetch dashboard data:", err);
         setError(
@@ -48,6 +67,73 @@ export function DoctorDashboard() {
     };
 
     fetchData();
+
+    // Aging moves patients up without any write, so re-read the ranking
+    const refreshQueue = async () => {
+      try {
+        setPatients(
+          (await getTriageQueue({ top: QUEUE_SIZE, fields: QUEUE_FIELDS }))
+            .patients
+        );
+      } catch (err) {
+        console.error("Failed to refresh the triage queue:", err);
+      }
+    };
+    const queueTimer = setInterval(refreshQueue, QUEUE_REFRESH_MS);
+
+    let statsTimer: ReturnType<typeof setTimeout> | undefined;
+    const refreshStats = () => {
+      clearTimeout(statsTimer);
+      statsTimer = setTimeout(async () => {
+        try {
+          setStats(await getDashboardStats());
+        } catch (err) {
+          console.error("Failed to refresh dashboard stats:", err);
+        }
+      }, STATS_REFRESH_DELAY_MS);
+    };
+
+    // Live updates: apply patient changes in place from the event payload
+    const unsubscribe = subscribeToChanges(
+      (event) => {
+        if (event.op === "import") {
+          fetchData();
+          return;
+        }
+        if (event.op === "delete") {
+          setPatients((prev) => prev.filter((p) => p.id !== event.row_id));
+        } else {
+          setPatients((prev) => {
+            const existing = prev.find((p) => p.id === event.row_id);
+            // Updates to patients outside the queue don't concern it
+            if (!existing && event.op !== "insert") return prev;
+            const patient = {
+              ...existing,
+              ...event.fields,
+              id: event.row_id,
+              // A new arrival hasn't aged yet; a re-scored patient is re-ranked
+              // by the server on the next queue refresh, by score until then
+              effective_priority:
+                "urgency_score" in event.fields
+                  ? event.op === "insert"
+                    ? (event.fields.urgency_score as number)
+                    : undefined
+                  : existing?.effective_priority,
+            } as PatientResponse;
+            return [...prev.filter((p) => p.id !== event.row_id), patient]
+              .sort(byPriority)
+              .slice(0, QUEUE_SIZE);
+          });
+        }
+        refreshStats();
+      },
+      { tables: ["patients"], onReset: fetchData }
+    );
+    return () => {
+      clearInterval(queueTimer);
+      clearTimeout(statsTimer);
+      unsubscribe();
+    };
   }, []);
 
   if (isLoading) {
@@ -32,7 +32,7 @@ export function PatientDashboard() {
     const fetchData = async () => {
       try {
         setIsLoading(true);
-        const data = await getPatients({ limit: 5 });
+        const data = await getPatients({ limit: 5, fields: "*" });
         setTotalRecords(data.total);
         if (data.patients.length > 0) {
           setLatestPatient(data.patients[0]);
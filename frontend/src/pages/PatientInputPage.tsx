@@ -21,7 +21,13 @@ import { Label } from "@/components/ui/label";
 import { Textarea } from "@/components/ui/textarea";
 import { Badge } from "@/components/ui/badge";
 import { createPatient } from "@/lib/api";
+import type { VoiceTranscriptionResponse } from "@/lib/api";
 import { transcribeVoice } from "@/lib/api/patients";
+import {
+  isVoiceStreamSupported,
+  startVoiceStream,
+  type VoiceStream,
+} from "@/lib/api/voice";
 import { uploadPrescription } from "@/lib/api/prescriptions";
 import { toast } from "sonner";
 
@@ -45,11 +51,14 @@ export function PatientInputPage() {
   const [isLoading, setIsLoading] = useState(false);
   const [isDigitizing, setIsDigitizing] = useState(false);
   const [isTranscribing, setIsTranscribing] = useState(false);
+  const [liveSymptoms, setLiveSymptoms] = useState("");
   const [error, setError] = useState<string | null>(null);
   const [submitted, setSubmitted] = useState(false);
 
   // Refs for recording
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
+  const voiceStreamRef = useRef<VoiceStream | null>(null);
+  const micStreamRef = useRef<MediaStream | null>(null);
   const audioChunksRef = useRef<Blob[]>([]);
   const timerRef = useRef<any>(null);
 
@@ -149,7 +158,61 @@ export function PatientInputPage() {
     }
   };
 
+  const startTimer = () => {
+    setRecording(true);
+    setRecordTime(0);
+
+    timerRef.current = setInterval(() => {
+      setRecordTime((t) => {
+        if (t >= 60) {
+          stopRecording();
+          return t;
+        }
+        return t + 1;
+      });
+    }, 1000);
+  };
+
+  const releaseMicrophone = () => {
+    micStreamRef.current?.getTracks().forEach((track) => track.stop());
+    micStreamRef.current = null;
+  };
+
+  // Streams PCM to the server while recording; symptoms fill in at each pause
+  const startStreaming = async () => {
+    const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+    micStreamRef.current = stream;
+    try {
+      voiceStreamRef.current = await startVoiceStream(stream, {
+        onPartial: (partial) => setLiveSymptoms(partial.symptoms),
+        onError: (err) => {
+          console.error("Voice stream failed:", err);
+          voiceStreamRef.current = null;
+          releaseMicrophone();
+          setRecording(false);
+          setLiveSymptoms("");
+          if (timerRef.current) clearInterval(timerRef.current);
+          toast.error("Live transcription was interrupted. Please try again.");
+        },
+      });
+    } catch (err) {
+      releaseMicrophone();
+      throw err;
+    }
+    setLiveSymptoms("");
+    startTimer();
+  };
+
   const startRecording = async () => {
+    if (isVoiceStreamSupported()) {
+      try {
+        await startStreaming();
+        return;
+      } catch (err) {
+        console.warn("Voice streaming unavailable, recording a clip instead:", err);
+      }
+    }
+
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
 
@@ -192,18 +255,7 @@ export function PatientInputPage() {
 
       // Collect data every 200ms
       mediaRecorder.start(200);
-      setRecording(true);
-      setRecordTime(0);
-
-      timerRef.current = setInterval(() => {
-        setRecordTime((t) => {
-          if (t >= 60) {
-            stopRecording();
-            return t;
-          }
-          return t + 1;
-        });
-      }, 1000);
+      startTimer();
     } catch (err) {
       console.error("Microphone access denied:", err);
       toast.error(
@@ -213,6 +265,27 @@ export function PatientInputPage() {
   };
 
   const stopRecording = () => {
+    const voiceStream = voiceStreamRef.current;
+    if (voiceStream) {
+      voiceStreamRef.current = null;
+      setRecording(false);
+      if (timerRef.current) clearInterval(timerRef.current);
+      setIsTranscribing(true);
+      const result = voiceStream.stop();
+      releaseMicrophone();
+      result
+        .then(applyTranscription)
+        .catch((err) => {
+          console.error("Transcription failed:", err);
+          toast.error("AI was unable to transcribe the audio. Please try again.");
+        })
+        .finally(() => {
+          setIsTranscribing(false);
+          setLiveSymptoms("");
+          setRecordTime(0);
+        });
+      return;
+    }
     if (mediaRecorderRef.current && recording) {
       mediaRecorderRef.current.stop();
       setRecording(false);
@@ -220,29 +293,33 @@ export function PatientInputPage() {
     }
   };
 
+  const applyTranscription = (result: VoiceTranscriptionResponse) => {
+    // Auto-fill extracted fields
+    if (result.name) setName(result.name);
+    if (result.age) setAge(result.age.toString());
+    if (result.gender) setGender(result.gender);
+
+    // Update symptoms with extracted summary and raw transcription context
+    const symptomsText = result.symptoms;
+    const rawContent = `\n\nVoice Summary: ${result.raw_transcription}`;
+
+    setSymptoms((prev) =>
+      prev
+        ? `${prev}\n\n${symptomsText}${rawContent}`
+        : `${symptomsText}${rawContent}`
+    );
+
+    toast.success("Voice intelligence: Form updated with patient details!");
+    setActiveTab("text"); // Switch back to text to review the auto-filled data
+  };
+
   const handleTranscription = async (blob: Blob) => {
     try {
       setIsTranscribing(true);
       const result = await transcribeVoice(blob);
 
       if (result) {
-        // Auto-fill extracted fields
-        if (result.name) setName(result.name);
-        if (result.age) setAge(result.age.toString());
-        if (result.gender) setGender(result.gender);
-
-        // Update symptoms with extracted summary and raw transcription context
-        const symptomsText = result.symptoms;
-        const rawContent = `\n\nVoice Summary: ${result.raw_transcription}`;
-
-        setSymptoms((prev) =>
-          prev
-            ? `${prev}\n\n${symptomsText}${rawContent}`
-            : `${symptomsText}${rawContent}`
-        );
-
-        toast.success("Voice intelligence: Form updated with patient details!");
-        setActiveTab("text"); // Switch back to text to review the auto-filled data
+        applyTranscription(result);
       }
     } catch (err) {
       console.error("Transcription failed:", err);
@@ -524,7 +601,7 @@ export function PatientInputPage() {
                 )}
               </div>
 
-              <div className="h-12 flex flex-col items-center justify-center gap-2">
+              <div className="min-h-12 flex flex-col items-center justify-center gap-2">
                 <AnimatePresence mode="wait">
                   {recording ? (
                     <motion.div
@@ -554,6 +631,11 @@ export function PatientInputPage() {
                         REC {Math.floor(recordTime / 60)}:
                         {(recordTime % 60).toString().padStart(2, "0")}
                       </span>
+                      {liveSymptoms && (
+                        <p className="text-xs text-muted-foreground max-w-sm mt-1">
+                          {liveSymptoms}
+                        </p>
+                      )}
                     </motion.div>
                   ) : (
                     <motion.div